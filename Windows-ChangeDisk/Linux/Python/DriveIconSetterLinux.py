@@ -28,15 +28,23 @@ FEATURES:
 
 import os
 import sys
-import shutil
 import subprocess
-import tempfile
 import time
 import glob
+import hashlib
+import re
+import select
+import socket
+import io
+import struct
+import tarfile
+import zipfile
 import platform
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                wait, FIRST_COMPLETED)
 import pwd
 import grp
 
@@ -68,6 +76,12 @@ except ModuleNotFoundError:
         print(f"Run: {sys.executable} -m pip install Pillow")
         sys.exit(1)
 
+# Colour management is optional: Pillow may be built without LittleCMS
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None
+
 # ── Linux Desktop Environment Detection ───────────────────────────────────────
 def detect_desktop_environment():
     """Detect which Linux DE is running"""
@@ -119,170 +133,1832 @@ CONFIG_DIR = os.path.join(HOME, ".config", "drive-icon-setter")
 ICON_STORE = os.path.join(CONFIG_DIR, "icons")
 os.makedirs(ICON_STORE, exist_ok=True)
 
+# Render cache size cap (LRU eviction above this), override with DRIVE_ICON_CACHE_MB
+ICON_STORE_MAX_BYTES = int(os.environ.get("DRIVE_ICON_CACHE_MB", "128")) * 1024 * 1024
+
 # Icon sizes for Linux (PNG format)
 PNG_SIZES = [512, 256, 128, 64, 48, 32, 16]
 
+# Windows .ico sizes (256 stored as PNG, the rest as 32-bit BMP)
+ICO_SIZES = [256, 128, 64, 48, 32, 16]
+
+# macOS .icns chunk types (PNG payloads) and the pixel size each one holds
+ICNS_TYPES = [(b"ic11", 32), (b"ic12", 64), (b"ic07", 128), (b"ic13", 256),
+              (b"ic08", 256), (b"ic14", 512), (b"ic09", 512), (b"ic10", 1024)]
+ICNS_SIZES = sorted({size for _, size in ICNS_TYPES}, reverse=True)
+
+# PNG optimiser presets: zlib level, compress_type strategies tried (-1 Pillow
+# default with per-row filter choice, 0 zlib default, 1 filtered,
+# 2 huffman-only, 3 RLE, 4 fixed), optimize flag and the largest size that
+# may be quantised to a lossy 256-colour palette (only "smallest" does).
+# Lossless palettes (256 colours or fewer) are tried by every preset but
+# "fast", which is a single plain encode and the default
+PNG_PRESETS = {
+    "fast": (6, (-1,), False, 0),
+    "balanced": (9, (-1, 0, 1), False, 0),
+    "smallest": (9, (-1, 0, 1, 2, 3, 4), True, 64),
+}
+PNG_PRESET = os.environ.get("DRIVE_ICON_PNG_PRESET", "fast")
+
+# Threads used to resize/encode icon sizes in parallel (1 = serial)
+RENDER_WORKERS = os.cpu_count() or 1
+
+# Preview thumbnail size
+THUMB_SIZE = 96
+
+# Browsed images are decoded to a proxy whose short side is at least this
+# (the largest size we output); full resolution is only read if a crop needs it
+PROXY_SIZE = max(ICNS_SIZES)
+
+# Peak-RSS budget for low-RAM machines, in MB (0 = unbounded). With a budget,
+# plan_render() estimates the render's footprint against what is left of it
+# and lowers the worker count until it fits; if even one worker does not
+# fit, sizes render one at a time, largest first, and the source is released
+# as soon as the largest size exists. Override with DRIVE_ICON_MEMORY_MB
+MEMORY_BUDGET_MB = int(os.environ.get("DRIVE_ICON_MEMORY_MB", "0"))
+
+# Convert images with an embedded ICC profile to sRGB on load
+# (needs ImageCms), disable with DRIVE_ICON_COLOR_MANAGE=0
+COLOR_MANAGE = os.environ.get("DRIVE_ICON_COLOR_MANAGE", "1") != "0" and ImageCms is not None
+
+# Filesystem calls against a mount (statvfs, exists, scandir) run on at most
+# PROBE_WORKERS threads and are given up on after PROBE_TIMEOUT seconds, so a
+# stale NFS/CIFS/sshfs mount is reported "unresponsive" instead of hanging.
+# Override with DRIVE_ICON_PROBE_TIMEOUT
+PROBE_WORKERS = 8
+PROBE_TIMEOUT = float(os.environ.get("DRIVE_ICON_PROBE_TIMEOUT", "1.5"))
+
+# Mounts that timed out are re-probed by the mount watcher after
+# PROBE_RETRY seconds, doubling each time, at most PROBE_RETRIES times (it
+# only wakes on a timer while such a retry is due)
+PROBE_RETRY = 5.0
+PROBE_RETRIES = 6
+
+# ==============================================================================
+#  MOUNT PROBING
+# ==============================================================================
+
+_probe_slots = threading.Semaphore(PROBE_WORKERS)
+_probe_lock = threading.Lock()
+_probe_hung = {}
+
+def _probe_run(job, fn, args):
+    """Worker side of a probe; an abandoned job only clears its hung entry"""
+    try:
+        job['result'] = fn(*args)
+    except Exception as e:
+        job['error'] = e
+    with _probe_lock:
+        job['finished'] = True
+        if job['abandoned']:
+            if _probe_hung.get(job['key']) is job:
+                del _probe_hung[job['key']]
+        else:
+            _probe_slots.release()
+    job['done'].set()
+
+def probe_many(calls, timeout=None):
+    """
+    Run [(mount_point, fn, args), ...] in parallel, all sharing one deadline
+    Returns [(result, error), ...] in order. error is the exception fn
+    raised, or TimeoutError when the mount did not answer in time. A mount
+    whose earlier probe is still stuck fails at once without a new thread,
+    and a stuck thread gives its slot back, so hung mounts never starve
+    the pool
+    """
+    timeout = PROBE_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    jobs = []
+    for key, fn, args in calls:
+        with _probe_lock:
+            hung = key in _probe_hung
+        if hung or not _probe_slots.acquire(timeout=max(0, deadline - time.monotonic())):
+            jobs.append((key, None))
+            continue
+        job = {'key': key, 'done': threading.Event(), 'result': None, 'error': None,
+               'finished': False, 'abandoned': False}
+        threading.Thread(target=_probe_run, args=(job, fn, args), daemon=True,
+                        name=f"probe {key}").start()
+        jobs.append((key, job))
+    
+    results = []
+    for key, job in jobs:
+        if job is not None and not job['done'].wait(max(0, deadline - time.monotonic())):
+            with _probe_lock:
+                if not job['finished']:
+                    job['abandoned'] = True
+                    _probe_hung[key] = job
+                    _probe_slots.release()
+                    job = None
+        if job is None:
+            results.append((None, TimeoutError(f"{key} did not answer within {timeout:g}s")))
+        else:
+            results.append((job['result'], job['error']))
+    return results
+
+def probe(mount_point, fn, *args, timeout=None):
+    """fn(*args) against one mount; raises TimeoutError if it does not answer"""
+    result, error = probe_many([(mount_point, fn, args)], timeout)[0]
+    if error is not None:
+        raise error
+    return result
+
 # ==============================================================================
 #  MOUNT POINT DETECTION
 # ==============================================================================
 
+# Mount classification runs on mountinfo fields alone, before any syscall.
+# Filesystems the kernel flags "nodev" in /proc/filesystems are pseudo
+# unless they are network shares or real storage registered without a block
+# device (ZFS datasets, virtiofs and VM shared folders); PSEUDO_FSTYPES is
+# the fallback when
+# /proc/filesystems cannot be read. Read-only loop images (snaps, AppImages)
+# and squashfs/erofs are images, not drives
+PSEUDO_FSTYPES = {'proc', 'sysfs', 'devtmpfs', 'tmpfs', 'devpts', 'fusectl',
+                  'securityfs', 'cgroup', 'cgroup2', 'pstore', 'debugfs', 'hugetlbfs',
+                  'mqueue', 'configfs', 'binfmt_misc', 'rpc_pipefs', 'overlay',
+                  'nsfs', 'autofs', 'tracefs', 'bpf', 'efivarfs', 'ramfs', 'fuse'}
+# Any other fuse.* type is treated as pseudo, so FUSE filesystems holding
+# user data must be listed in one of these two sets
+NETWORK_FSTYPES = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'ceph',
+                   'glusterfs', 'fuse.sshfs', 'fuse.rclone', 'davfs',
+                   'fuse.s3fs', 'fuse.gcsfuse', 'fuse.juicefs', 'fuse.glusterfs'}
+STORAGE_NODEV_FSTYPES = {'zfs', 'virtiofs', 'vboxsf', 'prl_fs', 'fuse.vmhgfs-fuse',
+                         'lustre', 'beegfs', 'gpfs', 'orangefs', 'afs',
+                         'fuse.mergerfs', 'fuse.unionfs', 'fuse.unionfs-fuse',
+                         'fuse.bindfs', 'fuse.gocryptfs', 'fuse.encfs', 'fuse.cryfs',
+                         'fuse.securefs', 'fuse.ntfs-3g', 'fuse.ntfs', 'fuse.exfat'}
+IMAGE_FSTYPES = {'squashfs', 'erofs'}
+LOOP_MAJOR = 7
+SYSTEM_MOUNTS = {'/boot', '/boot/efi', '/dev', '/sys', '/proc', '/run'}
+SYSTEM_PREFIXES = ('/proc/', '/sys/', '/dev/', '/snap/', '/var/snap/',
+                   '/var/lib/docker/', '/var/lib/containers/')
+
+_nodev_fstypes = None
+
+def _mount_unescape(field):
+    """Decode the \\NNN octal escapes used in /proc/self/mountinfo paths"""
+    if '\\' not in field:
+        return field
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+def parse_mountinfo(path='/proc/self/mountinfo'):
+    """
+    Raw mount table from mountinfo, one dict per line:
+    mount_id, parent_id, major, minor, root, mount_point, options,
+    propagation, fstype, device, super_options
+    """
+    with open(path, 'r') as f:
+        return _parse_mountinfo_lines(f)
+
+def _parse_mountinfo_lines(lines, skip_pseudo=False):
+    """
+    parse_mountinfo() over an iterable of mountinfo lines
+    skip_pseudo drops pseudo filesystems before their entry is built
+    """
+    entries = []
+    for line in lines:
+        parts = line.split()
+        try:
+            sep = parts.index('-', 6)
+            major, minor = parts[2].split(':')
+        except ValueError:
+            continue
+        if len(parts) < sep + 3 or (skip_pseudo and _pseudo_fstype(parts[sep + 1])):
+            continue
+        entries.append({
+            'mount_id': int(parts[0]),
+            'parent_id': int(parts[1]),
+            'major': int(major),
+            'minor': int(minor),
+            'root': _mount_unescape(parts[3]),
+            'mount_point': _mount_unescape(parts[4]),
+            'options': parts[5].split(','),
+            'propagation': parts[6:sep] or ['private'],
+            'fstype': parts[sep + 1],
+            'device': _mount_unescape(parts[sep + 2]),
+            'super_options': parts[sep + 3].split(',') if len(parts) > sep + 3 else [],
+        })
+    return entries
+
+_block_index = {}
+_block_names = {}
+_block_lock = threading.Lock()
+
+def _read_sysfs(path, default=''):
+    """Stripped contents of a sysfs attribute, default if unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+def _usb_port_dir(real):
+    """The USB device directory (e.g. .../usb2/2-1) in a sysfs path, or None"""
+    if '/usb' not in real:
+        return None
+    parts = real.split('/')
+    for i in range(len(parts) - 1, 0, -1):
+        if re.match(r'^\d+-[\d.]+$', parts[i]):
+            return '/'.join(parts[:i + 1])
+    return None
+
+def _block_record(name):
+    """Own sysfs attributes of /sys/class/block/<name>; parents resolved later"""
+    node = os.path.join('/sys/class/block', name)
+    try:
+        major, minor = _read_sysfs(os.path.join(node, 'dev')).split(':')
+    except ValueError:
+        return None
+    real = os.path.realpath(node)
+    partition = os.path.exists(os.path.join(real, 'partition'))
+    
+    if partition:
+        parents = [os.path.basename(os.path.dirname(real))]
+    else:
+        # device-mapper / LUKS / md sit on their slaves
+        try:
+            parents = sorted(os.listdir(os.path.join(node, 'slaves')))
+        except OSError:
+            parents = []
+    
+    usb_dir = _usb_port_dir(real)
+    serial = (_read_sysfs(os.path.join(node, 'serial'))
+              or _read_sysfs(os.path.join(node, 'device', 'serial'))
+              or (_read_sysfs(os.path.join(usb_dir, 'serial')) if usb_dir else ''))
+    return {
+        'name': name,
+        'dev': os.makedev(int(major), int(minor)),
+        'partition': partition,
+        'parents': parents,
+        'backing_file': _read_sysfs(os.path.join(node, 'loop', 'backing_file')) or None,
+        'removable': _read_sysfs(os.path.join(node, 'removable')) == '1',
+        'usb': usb_dir is not None,
+        'bus_path': os.path.basename(usb_dir) if usb_dir else None,
+        'vendor': _read_sysfs(os.path.join(node, 'device', 'vendor')),
+        'model': _read_sysfs(os.path.join(node, 'device', 'model')),
+        'serial': serial,
+        'size': int(_read_sysfs(os.path.join(node, 'size'), '0') or 0) * 512,
+    }
+
+def _resolve_disk(name, seen=()):
+    """Name of the physical disk under a block device, following partitions,
+    dm/LUKS slaves and loop backing files"""
+    dev = _block_names.get(name)
+    record = _block_index.get(dev)
+    if record is None or name in seen:
+        return name
+    seen = seen + (name,)
+    if record['parents']:
+        return _resolve_disk(record['parents'][0], seen)
+    if record['backing_file']:
+        try:
+            backing = _block_index.get(os.stat(record['backing_file']).st_dev)
+        except OSError:
+            backing = None
+        if backing:
+            return _resolve_disk(backing['name'], seen)
+    return name
+
+def refresh_block_index(stale=()):
+    """
+    Bring the dev_t -> record index up to date with /sys/class/block
+    Only devices that appeared (or changed dev_t) are read, plus any names
+    in stale (e.g. media change); vanished ones are dropped. Each record
+    gets 'disk' and the disk's removable / usb / bus_path / vendor /
+    model / serial as 'disk_*' copies
+    """
+    try:
+        names = set(os.listdir('/sys/class/block'))
+    except OSError:
+        names = set()
+    
+    with _block_lock:
+        changed = False
+        for name in list(_block_names):
+            if name not in names:
+                _block_index.pop(_block_names.pop(name), None)
+                changed = True
+        
+        for name in names:
+            dev = _block_names.get(name)
+            if dev is not None and name not in stale and _read_sysfs(f'/sys/class/block/{name}/dev') == f'{os.major(dev)}:{os.minor(dev)}':
+                continue
+            record = _block_record(name)
+            if record is None:
+                if dev is not None:
+                    _block_index.pop(_block_names.pop(name), None)
+                    changed = True
+                continue
+            if dev is not None:
+                _block_index.pop(dev, None)
+            _block_index[record['dev']] = record
+            _block_names[name] = record['dev']
+            changed = True
+        
+        if changed:
+            for record in _block_index.values():
+                disk = _block_index.get(_block_names.get(_resolve_disk(record['name']))) or record
+                record['disk'] = disk['name']
+                for k in ('removable', 'usb', 'bus_path', 'vendor', 'model', 'serial'):
+                    record['disk_' + k] = disk[k]
+        return _block_index
+
+def block_device(dev):
+    """
+    Index record for a dev_t (st_dev / st_rdev or os.makedev(major, minor))
+    None for anonymous filesystems; an unknown device triggers one refresh
+    """
+    if not os.major(dev):
+        return None
+    record = _block_index.get(dev)
+    if record is None:
+        record = refresh_block_index().get(dev)
+    return record
+
 def get_mount_points():
-    """Get all mounted drives/partitions"""
+    """
+    Get all mounted drives/partitions in one pass over /proc/self/mountinfo
+    Each record: device, mount_point, fstype, total, used, free, label,
+    uuid, major, minor, options, propagation, removable, usb, size, type,
+    disk (parent disk name from the block index), category (see
+    classify_mount), state ('ok' or
+    'unresponsive' when statvfs missed its deadline; sizes are then 0)
+    """
+    try:
+        with open('/proc/self/mountinfo', 'r') as f:
+            entries = _parse_mountinfo_lines(f, skip_pseudo=True)
+    except OSError:
+        return []
+    return mount_records(e for e in entries if _wanted_mount(e))
+
+def nodev_fstypes():
+    """Filesystem types flagged nodev in /proc/filesystems (read once)"""
+    global _nodev_fstypes
+    if _nodev_fstypes is None:
+        try:
+            with open('/proc/filesystems', 'r') as f:
+                _nodev_fstypes = {line.split()[-1] for line in f
+                                  if line.startswith('nodev') and line.split()}
+        except OSError:
+            _nodev_fstypes = set(PSEUDO_FSTYPES)
+    return _nodev_fstypes
+
+def _pseudo_fstype(fstype):
+    """True for kernel/virtual filesystem types (network shares and nodev
+    storage excluded)"""
+    if fstype in NETWORK_FSTYPES or fstype in STORAGE_NODEV_FSTYPES:
+        return False
+    return (
+        fstype in PSEUDO_FSTYPES or fstype in nodev_fstypes() or fstype.startswith('fuse.'))
+
+def classify_mount(entry):
+    """
+    'local', 'network', 'pseudo', 'image' or 'system' for a mountinfo entry
+    Uses only the entry itself and the cached nodev set
+    """
+    fstype = entry['fstype']
+    mount_point = entry['mount_point']
+    if fstype in NETWORK_FSTYPES:
+        return 'network'
+    if _pseudo_fstype(fstype):
+        return 'pseudo'
+    if fstype in IMAGE_FSTYPES or (entry['major'] == LOOP_MAJOR and 'ro' in entry['options']):
+        return 'image'
+    if mount_point in SYSTEM_MOUNTS or mount_point.startswith(SYSTEM_PREFIXES):
+        return 'system'
+    return 'local'
+
+def _wanted_mount(entry):
+    """True for drives and network shares worth showing"""
+    return classify_mount(entry) in ('local', 'network')
+
+def benchmark_mount_refresh(counts=(20, 200, 1000, 5000), real=10, rounds=5):
+    """
+    Time a refresh (parse + classify + probe + records) over synthetic mount
+    tables of each size: `real` disk mounts padded with snap loops, docker
+    overlays, nsfs, fuse portals and cgroups. Returns [(mounts, shown, ms)]
+    with the best of `rounds`
+    """
+    padding = [
+        "{i} 1 7:{m} / /snap/app{i}/1 ro,nodev,relatime shared:{i} - squashfs /dev/loop{m} ro",
+        "{i} 1 0:{m} / /var/lib/docker/overlay2/{i}/merged rw,relatime - overlay overlay rw",
+        "{i} 1 0:4 net:[{i}] /run/docker/netns/{i} rw - nsfs nsfs rw",
+        "{i} 1 0:{m} / /run/user/{i}/doc rw,nosuid,nodev - fuse.portal portal rw",
+        "{i} 1 0:{m} / /sys/fs/cgroup/c{i} rw,nosuid - cgroup2 cgroup2 rw",
+    ]
+    results = []
+    for count in counts:
+        lines = [f"{i} 1 0:0 / / rw,relatime - ext4 /dev/bench{i} rw" for i in range(real)]
+        lines += [padding[i % len(padding)].format(i=i, m=i % 256)
+                  for i in range(real, count)]
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            shown = mount_records(e for e in _parse_mountinfo_lines(lines, skip_pseudo=True)
+                                  if _wanted_mount(e))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((count, len(shown), best * 1000))
+    return results
+
+def mount_records(entries):
+    """Mount records (see get_mount_points) for already-filtered mountinfo entries"""
     mounts = []
+    labels = get_label_index()
+    entries = list(entries)
+    stats = probe_many([(e['mount_point'], os.statvfs, (e['mount_point'],)) for e in entries])
     
-    try:
-        with open('/proc/mounts', 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) > 1:
-                    device = parts[0]
-                    mount_point = parts[1]
-                    fstype = parts[2]
-                    
-                    # Skip pseudo filesystems
-                    if fstype in ['proc', 'sysfs', 'devtmpfs', 'tmpfs', 'devpts', 'fusectl',
-                                 'securityfs', 'cgroup', 'pstore', 'debugfs', 'hugetlbfs',
-                                 'mqueue', 'configfs', 'binfmt_misc', 'rpc_pipefs']:
-                        continue
-                    
-                    # Skip system directories
-                    if mount_point in ['/boot', '/boot/efi', '/dev', '/sys', '/proc', '/run']:
-                        continue
-                    
-                    # Get filesystem info
-                    try:
-                        stat = os.statvfs(mount_point)
-                        total = stat.f_blocks * stat.f_frsize
-                        free = stat.f_bavail * stat.f_frsize
-                        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
-                        
-                        # Get label if available
-                        label = get_filesystem_label(device)
-                        
-                        mounts.append({
-                            'device': device,
-                            'mount_point': mount_point,
-                            'fstype': fstype,
-                            'total': total,
-                            'used': used,
-                            'free': free,
-                            'label': label or os.path.basename(mount_point)
-                        })
-                    except:
-                        pass
-    except:
-        pass
+    for entry, (stat, error) in zip(entries, stats):
+        device = entry['device']
+        mount_point = entry['mount_point']
+        
+        # Gone or inaccessible mounts are skipped; slow ones are kept but marked
+        state = 'ok'
+        if isinstance(error, TimeoutError):
+            state = 'unresponsive'
+        elif error is not None:
+            continue
+        
+        # Get label / UUID if available (one cached index, no blkid per mount)
+        ids = labels.get(os.path.realpath(device), {}) if device.startswith('/dev/') else {}
+        dev = block_device(os.makedev(entry['major'], entry['minor']))
+        if dev is None and device.startswith('/dev/'):
+            # btrfs and friends mount with an anonymous dev_t (major 0):
+            # look the source node up instead
+            try:
+                dev = block_device(os.stat(device).st_rdev)
+            except OSError:
+                pass
+        dev = dev or {}
+        removable = dev.get('disk_removable', False)
+        usb = dev.get('disk_usb', False)
+        
+        mounts.append({
+            'device': device,
+            'mount_point': mount_point,
+            'fstype': entry['fstype'],
+            'total': stat.f_blocks * stat.f_frsize if stat else 0,
+            'used': (stat.f_blocks - stat.f_bfree) * stat.f_frsize if stat else 0,
+            'free': stat.f_bavail * stat.f_frsize if stat else 0,
+            'label': ids.get('label') or os.path.basename(mount_point),
+            'uuid': ids.get('uuid'),
+            'major': entry['major'],
+            'minor': entry['minor'],
+            'options': entry['options'],
+            'propagation': entry['propagation'],
+            'removable': removable,
+            'usb': usb,
+            'size': dev.get('size', 0),
+            'disk': dev.get('disk'),
+            'type': 'removable' if removable or usb else 'fixed',
+            'category': classify_mount(entry),
+            'state': state,
+        })
     
     return mounts
 
-def get_filesystem_label(device):
-    """Get filesystem label for a device"""
+_label_index = None
+_label_index_key = None
+_label_lock = threading.Lock()
+
+def _udev_unescape(name):
+    """Decode udev's \\xNN escapes in /dev/disk/by-* link names"""
+    return re.sub(r"\\x([0-9a-fA-F]{2})", lambda m: chr(int(m.group(1), 16)), name)
+
+def _device_set_key():
+    """
+    Changes whenever the block-device set (or its labels) changes:
+    /proc/partitions plus the mtimes of the /dev/disk/by-* directories
+    """
+    key = []
     try:
-        if device.startswith('/dev/'):
-            # Try blkid command
-            result = subprocess.run(['blkid', '-s', 'LABEL', '-o', 'value', device],
-                                   capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
+        with open('/proc/partitions') as f:
+            key.append(f.read())
+    except OSError:
+        key.append(None)
+    for d in ('/dev/disk/by-label', '/dev/disk/by-uuid'):
+        try:
+            key.append(os.stat(d).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+def build_label_index():
+    """
+    {device path: {'label': ..., 'uuid': ...}} for every block device
+    Built in one pass from the /dev/disk/by-label and /dev/disk/by-uuid
+    symlinks; without udev, one batched 'blkid -o export' call instead
+    """
+    index = {}
+    for kind, d in (('label', '/dev/disk/by-label'), ('uuid', '/dev/disk/by-uuid')):
+        try:
+            names = os.listdir(d)
+        except OSError:
+            continue
+        for name in names:
+            dev = os.path.realpath(os.path.join(d, name))
+            index.setdefault(dev, {})[kind] = _udev_unescape(name)
+    if index:
+        return index
+    
+    try:
+        result = subprocess.run(['blkid', '-o', 'export'],
+                               capture_output=True, text=True, timeout=10)
+        entry = {}
+        for line in result.stdout.splitlines() + ['']:
+            if '=' in line:
+                k, v = line.split('=', 1)
+                entry[k] = v
+            elif entry:
+                if 'DEVNAME' in entry:
+                    ids = {}
+                    if entry.get('LABEL'):
+                        ids['label'] = entry['LABEL']
+                    if entry.get('UUID'):
+                        ids['uuid'] = entry['UUID']
+                    index[os.path.realpath(entry['DEVNAME'])] = ids
+                entry = {}
     except:
         pass
-    return None
+    return index
+
+def get_label_index():
+    """Cached label/UUID index, rebuilt only when the device set changes"""
+    global _label_index, _label_index_key
+    key = _device_set_key()
+    with _label_lock:
+        if _label_index is None or key != _label_index_key:
+            _label_index = build_label_index()
+            _label_index_key = key
+        return _label_index
+
+def get_filesystem_label(device):
+    """Get filesystem label for a device"""
+    if not device.startswith('/dev/'):
+        return None
+    return get_label_index().get(os.path.realpath(device), {}).get('label')
 
-def get_removable_mounts():
-    """Get removable drives (USB, external HDD)"""
-    removable = []
-    mounts = get_mount_points()
+def get_removable_mounts(mounts=None):
+    """
+    Get removable drives (USB, external HDD)
+    mounts: result of get_mount_points() to filter (read fresh if None)
+    """
+    if mounts is None:
+        mounts = get_mount_points()
+    return [m for m in mounts if m['removable'] or m['usb']]
+
+class MountTrie:
+    """
+    Path -> mount entry by longest-prefix match over path components
+    Stacked mounts on one point keep mountinfo order, the last being on top
+    """
     
-    for mount in mounts:
-        device = mount['device']
-        if device.startswith('/dev/'):
-            try:
-                # Get base device name (e.g., sdb from /dev/sdb1)
-                base_device = device[5:].rstrip('0123456789')
-                
-                # Check sysfs for removable flag
-                removable_path = f'/sys/block/{base_device}/removable'
-                if os.path.exists(removable_path):
-                    with open(removable_path, 'r') as f:
-                        if f.read().strip() == '1':
-                            mount['type'] = 'removable'
-                            removable.append(mount)
-                            continue
-                
-                # Check if it's a USB device
-                usb_path = f'/sys/block/{base_device}'
-                if os.path.exists(usb_path):
-                    real_path = os.path.realpath(usb_path)
-                    if 'usb' in real_path:
-                        mount['type'] = 'usb'
-                        removable.append(mount)
-                        continue
-                
-                mount['type'] = 'fixed'
-            except:
-                mount['type'] = 'unknown'
+    def __init__(self, entries):
+        self.root = {'children': {}, 'mounts': []}
+        for entry in entries:
+            node = self.root
+            for part in entry['mount_point'].split('/'):
+                if part:
+                    node = node['children'].setdefault(part, {'children': {}, 'mounts': []})
+            node['mounts'].append(entry)
     
-    return removable
+    def lookup(self, path, st_dev=None):
+        """
+        Mountinfo entry holding path (made absolute; callers resolve
+        symlinks first, see get_device_info)
+        With st_dev (os.stat(path).st_dev) the deepest mount whose dev_t
+        matches wins, which tells bind mounts and over-mounts apart;
+        otherwise, or if none matches, the topmost deepest mount
+        """
+        node = self.root
+        chain = [node['mounts']] if node['mounts'] else []
+        for part in os.path.abspath(path).split('/'):
+            if not part:
+                continue
+            node = node['children'].get(part)
+            if node is None:
+                break
+            if node['mounts']:
+                chain.append(node['mounts'])
+        if not chain:
+            return None
+        if st_dev is not None:
+            for mounts in reversed(chain):
+                for entry in reversed(mounts):
+                    if os.makedev(entry['major'], entry['minor']) == st_dev:
+                        return entry
+        return chain[-1][-1]
+
+_mount_trie = None
+_mount_trie_file = None
+_mount_trie_poll = None
+_mount_trie_lock = threading.Lock()
+
+def mount_trie():
+    """
+    MountTrie of every mount, rebuilt only after the mount table changed
+    (POLLPRI pending on an open mountinfo handle, checked without waiting)
+    """
+    global _mount_trie, _mount_trie_file, _mount_trie_poll
+    with _mount_trie_lock:
+        if _mount_trie_file is None:
+            _mount_trie_file = open('/proc/self/mountinfo', 'r')
+            _mount_trie_poll = select.poll()
+            _mount_trie_poll.register(_mount_trie_file.fileno(), select.POLLPRI | select.POLLERR)
+        elif _mount_trie is not None and not _mount_trie_poll.poll(0):
+            return _mount_trie
+        _mount_trie_file.seek(0)
+        _mount_trie = MountTrie(_parse_mountinfo_lines(_mount_trie_file.read().splitlines()))
+        return _mount_trie
 
 def get_device_info(mount_point):
-    """Get detailed device information"""
+    """
+    Get detailed device information for any path: device, fstype,
+    options, dev (dev_t) and the mount_point holding it
+    """
     try:
-        # Get filesystem type
-        df_output = subprocess.run(['df', '-T', mount_point], 
-                                  capture_output=True, text=True)
-        lines = df_output.stdout.strip().split('\n')
-        if len(lines) >= 2:
-            parts = lines[1].split()
-            if len(parts) >= 2:
-                fstype = parts[1]
-                
-                # Get device
-                device = parts[0] if parts[0] != mount_point else 'unknown'
-                
-                return {
-                    'device': device,
-                    'fstype': fstype
-                }
+        # Resolve symlinks the same way stat does, both bounded by the probe
+        # deadline; a path that does not answer is looked up unresolved
+        path = os.path.abspath(mount_point)
+        
+        def resolve():
+            real = os.path.realpath(path)
+            return real, os.stat(real).st_dev
+        try:
+            path, st_dev = probe(path, resolve)
+        except OSError:
+            st_dev = None
+        entry = mount_trie().lookup(path, st_dev)
+        if entry:
+            return {
+                'device': entry['device'],
+                'fstype': entry['fstype'],
+                'options': entry['options'],
+                'dev': os.makedev(entry['major'], entry['minor']),
+                'mount_point': entry['mount_point'],
+            }
     except:
         pass
     
-    return {'device': 'unknown', 'fstype': 'unknown'}
+    return {'device': 'unknown', 'fstype': 'unknown', 'options': [], 'dev': None,
+            'mount_point': None}
+
+# ==============================================================================
+#  MOUNT WATCHER
+# ==============================================================================
+
+class MountWatcher:
+    """
+    Keeps the mount list current without rescanning
+    The kernel raises POLLPRI on /proc/self/mountinfo whenever the mount
+    table changes; a thread sleeps in poll() on it, diffs the new table by
+    mount point and builds records only for what changed. Unresponsive
+    mounts are re-probed with exponential backoff (PROBE_RETRY,
+    PROBE_RETRIES); with no retry due the poll has no timeout (no CPU while
+    idle).
+    Subscribers get callback(added, removed, changed), lists of mount
+    records, on the watcher thread
+    """
+    
+    def __init__(self, path='/proc/self/mountinfo'):
+        self.path = path
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._order = []
+        self._entries = {}
+        self._mounts = {}
+        self._retry = {}
+        self._file = None
+        self._wake = None
+        self._thread = None
+    
+    def subscribe(self, callback):
+        """Register callback(added, removed, changed)"""
+        self._subscribers.append(callback)
+    
+    def records(self):
+        """Current mount records, in mount table order"""
+        with self._lock:
+            return [self._mounts[mp] for mp in self._order if mp in self._mounts]
+    
+    def start(self):
+        """Take the first snapshot and start watching; returns records()"""
+        self._file = open(self.path, 'r')
+        self._wake = os.pipe()
+        self._scan()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="mount watcher")
+        self._thread.start()
+        return self.records()
+    
+    def stop(self):
+        """Stop the watcher thread and release its descriptors"""
+        if self._thread is None:
+            return
+        os.write(self._wake[1], b"x")
+        self._thread.join(timeout=1)
+        self._thread = None
+        self._file.close()
+        for fd in self._wake:
+            os.close(fd)
+    
+    def refresh(self):
+        """
+        Ask the watcher thread to re-probe every mount (fresh sizes and
+        states, retries start over); returns at once, results reach the
+        subscribers
+        """
+        if self._thread is not None:
+            os.write(self._wake[1], b"r")
+    
+    def _schedule(self, records, reset=False):
+        """Plan backoff retries for unresponsive records (call under _lock)"""
+        now = time.monotonic()
+        for record in records:
+            mp = record['mount_point']
+            if reset:
+                self._retry.pop(mp, None)
+            if record['state'] != 'unresponsive':
+                self._retry.pop(mp, None)
+                continue
+            attempt = self._retry.get(mp, (0, None))[0]
+            if attempt < PROBE_RETRIES:
+                self._retry[mp] = (attempt + 1, now + PROBE_RETRY * 2 ** attempt)
+            else:
+                self._retry[mp] = (attempt, None)    # gave up until it changes
+    
+    def _due(self):
+        """(mount points whose retry is due, seconds until the next or None)"""
+        now = time.monotonic()
+        with self._lock:
+            times = {mp: due for mp, (_, due) in self._retry.items() if due is not None}
+        due = [mp for mp, t in times.items() if t <= now]
+        later = [t - now for t in times.values() if t > now]
+        return due, (min(later) if later else None)
+    
+    def _reprobe(self, points, reset=False):
+        """Rebuild records for points; a recovered or newly readable mount is
+        reported as changed or added"""
+        with self._lock:
+            entries = [self._entries[mp] for mp in points if mp in self._entries]
+        records = mount_records(entries)
+        
+        added, changed = [], []
+        with self._lock:
+            for record in records:
+                mp = record['mount_point']
+                if mp not in self._entries:
+                    continue
+                old = self._mounts.get(mp)
+                if old is None:
+                    added.append(record)
+                elif old != record:
+                    changed.append(record)
+                self._mounts[mp] = record
+            self._schedule(records, reset)
+        return added, [], changed
+    
+    def _notify(self, added, removed, changed):
+        if not (added or removed or changed):
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(added, removed, changed)
+            except Exception:
+                pass
+    
+    def _scan(self):
+        """Re-read the table (which also re-arms POLLPRI) and apply the diff"""
+        self._file.seek(0)
+        entries = {}
+        for e in _parse_mountinfo_lines(self._file.read().splitlines(), skip_pseudo=True):
+            if _wanted_mount(e):
+                entries[e['mount_point']] = e    # last one wins for stacked mounts
+        
+        def ident(e):
+            return (e['mount_id'], e['major'], e['minor'], e['fstype'], e['device'],
+                    e['options'], e['super_options'])
+        
+        old = self._entries
+        gone = [mp for mp in old if mp not in entries]
+        fresh = [mp for mp in entries if mp not in old or ident(old[mp]) != ident(entries[mp])]
+        records = mount_records(entries[mp] for mp in fresh)
+        
+        with self._lock:
+            removed = [self._mounts.pop(mp) for mp in gone if mp in self._mounts]
+            added, changed = [], []
+            for record in records:
+                mp = record['mount_point']
+                (changed if mp in old else added).append(record)
+                self._mounts[mp] = record
+            for mp in fresh:
+                if mp in old and not any(r['mount_point'] == mp for r in records):
+                    removed.append(self._mounts.pop(mp, None) or {'mount_point': mp})
+            for mp in gone + fresh:
+                self._retry.pop(mp, None)
+            self._schedule(records)
+            self._entries = entries
+            self._order = list(entries)
+        return added, removed, changed
+    
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+        poller.register(self._wake[0], select.POLLIN)
+        while True:
+            due, wait_s = self._due()
+            events = poller.poll(None if wait_s is None else wait_s * 1000) if not due else []
+            try:
+                if any(fd == self._wake[0] for fd, _ in events):
+                    if b"x" in os.read(self._wake[0], 64):
+                        return
+                    with self._lock:
+                        points = list(self._order)
+                    self._notify(*self._reprobe(points, reset=True))
+                elif events:
+                    self._notify(*self._scan())
+                else:
+                    self._notify(*self._reprobe(self._due()[0]))
+            except Exception:
+                continue
+
+# ==============================================================================
+#  HOTPLUG (NETLINK UEVENTS)
+# ==============================================================================
+
+NETLINK_KOBJECT_UEVENT = 15
+
+def decode_uevent(data):
+    """
+    Kernel uevent datagram -> dict of its KEY=VALUE fields
+    The "ACTION@DEVPATH" header fills ACTION / DEVPATH when the body lacks
+    them. None for udevd's re-broadcasts ("libudev" header) and garbage
+    """
+    fields = data.split(b"\0")
+    header = fields[0].decode("utf-8", "replace")
+    if "@" not in header or header.startswith("libudev"):
+        return None
+    event = {}
+    for field in fields[1:]:
+        key, sep, value = field.decode("utf-8", "replace").partition("=")
+        if sep:
+            event[key] = value
+    action, _, devpath = header.partition("@")
+    event.setdefault("ACTION", action)
+    event.setdefault("DEVPATH", devpath)
+    return event
+
+class UeventListener:
+    """
+    Block-device hotplug without polling or pyudev
+    Listens on a NETLINK_KOBJECT_UEVENT socket (kernel multicast group 1),
+    keeps the block index in step with add / remove / change events and
+    calls subscribers with callback(action, event, record), where record is
+    the block index entry (None after a remove). Pass sock to feed it
+    from anything datagram-shaped, e.g. one end of
+    socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM) replaying
+    recorded uevents
+    """
+    
+    def __init__(self, sock=None):
+        self._sock = sock
+        self._subscribers = []
+        self._wake = None
+        self._thread = None
+    
+    def subscribe(self, callback):
+        """Register callback(action, event, record)"""
+        self._subscribers.append(callback)
+    
+    def start(self):
+        """Open the netlink socket (unless one was given) and start listening"""
+        if self._sock is None:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                                 NETLINK_KOBJECT_UEVENT)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            except OSError:
+                pass
+            sock.bind((0, 1))
+            self._sock = sock
+        self._wake = os.pipe()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="uevent listener")
+        self._thread.start()
+    
+    def stop(self):
+        """Stop listening and close the socket"""
+        if self._thread is None:
+            return
+        os.write(self._wake[1], b"x")
+        self._thread.join(timeout=1)
+        self._thread = None
+        self._sock.close()
+        for fd in self._wake:
+            os.close(fd)
+    
+    def handle(self, data):
+        """Apply one uevent datagram; returns (action, event, record) or None"""
+        event = decode_uevent(data)
+        if not event or event.get("SUBSYSTEM") != "block":
+            return None
+        action = event["ACTION"]
+        name = event.get("DEVNAME") or os.path.basename(event["DEVPATH"])
+        name = name[5:] if name.startswith("/dev/") else name
+        
+        if action not in ("add", "remove", "change"):
+            return None
+        refresh_block_index(stale=(name,))
+        with _block_lock:
+            record = _block_index.get(_block_names.get(name))
+        
+        for callback in list(self._subscribers):
+            try:
+                callback(action, event, record)
+            except Exception:
+                pass
+        return action, event, record
+    
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._sock.fileno(), select.POLLIN)
+        poller.register(self._wake[0], select.POLLIN)
+        while True:
+            events = poller.poll()
+            if any(fd == self._wake[0] for fd, _ in events):
+                return
+            try:
+                data = self._sock.recv(65536)
+            except OSError:
+                continue
+            if data:
+                self.handle(data)
 
 # ==============================================================================
 #  ICON CONVERSION FUNCTIONS
 # ==============================================================================
 
-def pil_to_png_set(img, output_dir, base_name="icon"):
-    """Convert PIL image to multiple PNG sizes for Linux"""
-    img = img.convert("RGBA")
-    icons = []
+_cms_transforms = {}
+_cms_lock = threading.Lock()
+
+def _srgb_transform(icc, mode):
+    """
+    ImageCms transform from an ICC profile to sRGB, built once per profile
+    hash and mode. None if the profile cannot be used (also cached)
+    """
+    key = (hashlib.sha256(icc).hexdigest(), mode)
+    with _cms_lock:
+        if key not in _cms_transforms:
+            try:
+                _cms_transforms[key] = ImageCms.buildTransform(
+                    ImageCms.ImageCmsProfile(io.BytesIO(icc)),
+                    ImageCms.createProfile("sRGB"), mode, "RGB")
+            except Exception:
+                _cms_transforms[key] = None
+        return _cms_transforms[key]
+
+def to_srgb(img):
+    """
+    Image converted to sRGB if it carries an embedded ICC profile
+    Returned unchanged when there is no profile, COLOR_MANAGE is off or the
+    profile cannot be used. Alpha is kept; the result has no profile
+    """
+    icc = img.info.get("icc_profile")
+    if not icc or not COLOR_MANAGE:
+        return img
     
-    for size in PNG_SIZES:
+    if img.mode in ("P", "PA"):
+        img = img.convert("RGBA")
+    alpha = img.getchannel("A") if "A" in img.getbands() else None
+    base = {"RGBA": "RGB", "LA": "L"}.get(img.mode, img.mode)
+    if base not in ("RGB", "CMYK", "L"):
+        return img
+    transform = _srgb_transform(icc, base)
+    if transform is None:
+        return img
+    try:
+        out = ImageCms.applyTransform(img if img.mode == base else img.convert(base),
+                                      transform)
+    except Exception:
+        return img
+    if alpha is not None:
+        out.putalpha(alpha)
+    out.info.pop("icc_profile", None)
+    return out
+
+def load_working_image(path, min_side=PROXY_SIZE, frame=0):
+    """
+    Decode an image file only as large as the icons need
+    JPEGs decode at a reduced DCT scale (draft) and other formats are
+    box-reduced by an integer factor, keeping the short side >= min_side.
+    frame picks the frame / page of animated and multi-page files.
+    Returns (RGBA proxy, full-resolution (width, height))
+    """
+    img = Image.open(path)
+    if frame:
+        img.seek(frame)
+    full_size = img.size
+    if img.format == "JPEG":
+        img.draft("RGB", (min_side, min_side))
+    factor = min(img.size) // max(1, min_side)
+    if factor >= 2:
+        if img.mode not in ("L", "LA", "RGB", "RGBA", "CMYK"):
+            img = img.convert("RGBA")
+        img = img.reduce(factor)
+    # Colour-manage after reducing: the transform runs on the smaller image
+    img = to_srgb(img)
+    return (img if img.mode == "RGBA" else img.convert("RGBA")), full_size
+
+def _preview_thumb(img):
+    """THUMB_SIZE preview copy of an image"""
+    t = to_srgb(img).convert("RGBA")
+    t.thumbnail((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
+    return t
+
+def load_image_progressive(path, cancel=None, on_header=None, on_preview=None,
+                           min_side=PROXY_SIZE, frame=None, on_frames=None):
+    """
+    Load a working image in stages, meant to run on a worker thread
+    on_header(size, format) fires as soon as the header is parsed and
+    on_preview(thumbnail) with a THUMB_SIZE image for every sharper stage
+    (a DCT-scaled draft first for JPEGs). cancel is a threading.Event
+    checked between stages. For an animated / multi-page file with no
+    frame chosen, on_frames() fires and nothing is decoded.
+    Returns (proxy, full size), or None if cancelled or a frame is needed
+    """
+    img = Image.open(path)
+    if on_header:
+        on_header(img.size, img.format)
+    if cancel is not None and cancel.is_set():
+        return None
+
+    if frame is None and on_frames and getattr(img, "is_animated", False):
+        on_frames()
+        return None
+
+    if img.format == "JPEG" and on_preview:
+        img.draft("RGB", (THUMB_SIZE, THUMB_SIZE))
+        on_preview(_preview_thumb(img))
+        if cancel is not None and cancel.is_set():
+            return None
+
+    proxy, full_size = load_working_image(path, min_side, frame or 0)
+    if cancel is not None and cancel.is_set():
+        return None
+    if on_preview:
+        on_preview(_preview_thumb(proxy))
+    return proxy, full_size
+
+def iter_frame_thumbs(path, frames, size=THUMB_SIZE, cancel=None):
+    """
+    (index, thumbnail) for the given frames of an animated / multi-page file
+    One handle seeks forward through the frames in order, so formats that
+    decode sequentially (GIF, WebP) never restart from frame 0, and frames
+    that are not asked for are never rendered
+    """
+    with Image.open(path) as img:
+        for i in sorted(frames):
+            if cancel is not None and cancel.is_set():
+                return
+            img.seek(i)
+            t = to_srgb(img).convert("RGBA")
+            t.thumbnail((size, size), Image.LANCZOS)
+            yield i, t
+
+class CropTransform:
+    """
+    Crop / zoom / background chosen in the CropEditor
+    Keeps the original source and the view parameters instead of a raster,
+    so every output size is resampled exactly once from the source.
+    off is the source pixel at the view's top-left corner, zoom is view
+    pixels per source pixel and view is the editor canvas size.
+    When src is a reduced proxy, origin is (path, full (width, height),
+    frame) and a sharper decode of that frame is read only for sizes that
+    would upsample the proxy
+    """
+
+    def __init__(self, src, off, zoom, background, view, origin=None):
+        self.src = src if src.mode == "RGBA" else src.convert("RGBA")
+        self.off = (float(off[0]), float(off[1]))
+        self.zoom = float(zoom)
+        self.background = background
+        self.view = view
+        self.origin = origin
+        self._digest = None
+        self._hires = None
+        self._lock = threading.Lock()
+
+    def key(self):
+        """Crop parameters as a stable string (render cache key part)"""
+        x0, y0 = self.off
+        return f"{x0:.3f},{y0:.3f},{self.zoom:.6f},{self.background},{self.view}"
+
+    def digest(self):
+        """Content hash of the source pixels (computed once)"""
+        if self._digest is None:
+            self._digest = image_digest(self.src)
+        return self._digest
+
+    def _source(self, size, hires=True):
+        """(image, scale vs src) to resample size from"""
+        need = size * self.zoom / self.view  # output pixels per src pixel
+        if self.origin is None or not hires or need <= 1:
+            return self.src, 1.0
+        path, full_size, frame = self.origin
+        full_short, short = min(full_size), min(self.src.size)
+        if short >= full_short:
+            return self.src, 1.0
+
+        with self._lock:
+            if self._hires is None or self._hires[1] < min(need, full_short / short):
+                min_side = min(full_short, int(short * need + 0.999))
+                cap = hires_cap(path, full_size)
+                if cap is not None and cap < min_side:
+                    if cap <= short:
+                        return self.src, 1.0
+                    min_side = cap
+                img, _ = load_working_image(path, min_side, frame)
+                self._hires = (img, img.width / self.src.width)
+            return self._hires
+
+    def release(self):
+        """Drop the sharper decode; it is re-read if a later render needs it"""
+        with self._lock:
+            self._hires = None
+
+    def render(self, size, resample=Image.LANCZOS, hires=True):
+        """
+        Render the crop as a size x size RGBA image in one resample
+        hires=False renders from the proxy only (previews: never reads the
+        original file)
+        """
+        src, r = self._source(size, hires)
+        sw, sh = src.size
+        x0, y0 = self.off[0] * r, self.off[1] * r
+        x1 = x0 + self.view / self.zoom * r
+        y1 = y0 + self.view / self.zoom * r
+        scale = self.zoom * size / (self.view * r)
+        bv = self.background
+
+        ci = Image.new("RGBA", (size, size),
+                      (255, 255, 255, 255) if bv == "white" else
+                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
+
+        sx0, sy0 = max(0, x0), max(0, y0)
+        sx1, sy1 = min(sw, x1), min(sh, y1)
+
+        if sx1 > sx0 and sy1 > sy0:
+            px = int(round((sx0 - x0) * scale))
+            py = int(round((sy0 - y0) * scale))
+            pw = max(1, int(round((sx1 - sx0) * scale)))
+            ph = max(1, int(round((sy1 - sy0) * scale)))
+            rs = src.resize((pw, ph), resample, box=(sx0, sy0, sx1, sy1))
+            ci.paste(rs, (px, py), rs)
+
+        if bv == "circle":
+            mk = Image.new("L", (size, size), 0)
+            ImageDraw.Draw(mk).ellipse((0, 0, size - 1, size - 1), fill=255)
+            ot = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            ot.paste(ci, mask=mk)
+            ci = ot
+
+        return ci
+
+def load_icon_source(src):
+    """
+    Decoded RGBA image for an icon source
+    Accepts a file path (CLI callers), encoded image bytes / memoryview, or
+    an already decoded PIL image, which is used as-is with no file round-trip.
+    A CropTransform is returned unchanged
+    """
+    if isinstance(src, CropTransform):
+        return src
+    if isinstance(src, str):
+        img = Image.open(src)
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        img = Image.open(io.BytesIO(src))
+    else:
+        img = src
+    img = to_srgb(img)
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+def map_sizes(fn, sizes, workers=None):
+    """
+    Run fn(size) for every size on a thread pool
+    Pillow releases the GIL in resize and zlib encode, so sizes render on
+    all cores. Results come back in the order of sizes; workers=1 runs
+    serially on the calling thread
+    """
+    sizes = list(sizes)
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers <= 1 or len(sizes) <= 1:
+        return [fn(size) for size in sizes]
+    with ThreadPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        return list(pool.map(fn, sizes))
+
+def encode_png(img):
+    """Encode an image to PNG bytes"""
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+def optimise_png(img, preset=None):
+    """
+    Smallest PNG encoding of img under an optimiser preset (PNG_PRESETS)
+    Picks palette or RGBA and the zlib strategy per image; no ICC or text
+    metadata is written. Returns (png bytes, bytes saved vs the first
+    candidate, the plain RGBA encode; 0 for "fast", which only makes that one)
+    """
+    level, strategies, optimize, palette_max = PNG_PRESETS[preset or PNG_PRESET]
+
+    candidates = [img]
+    if level > 6 or palette_max:
+        pal = img.quantize(256, method=Image.FASTOCTREE)
+        if max(img.size) <= palette_max or pal.convert(img.mode).tobytes() == img.tobytes():
+            candidates.append(pal)
+
+    best = baseline = None
+    for cand in candidates:
+        for strategy in strategies:
+            buf = io.BytesIO()
+            cand.save(buf, "PNG", compress_level=level, compress_type=strategy,
+                      optimize=optimize, icc_profile=None)
+            if baseline is None:
+                baseline = buf.tell()
+            if best is None or buf.tell() < len(best):
+                best = buf.getvalue()
+    return best, baseline - len(best)
+
+def build_resize_pyramid(img, sizes=PNG_SIZES, workers=None):
+    """
+    Render every requested square size from one RGBA source
+    Shrinks in stages: cheap integer reduce() while the working level is
+    still at least twice the target, then one final LANCZOS pass per size
+    (run in parallel across sizes). A CropTransform source renders each
+    size straight from its original instead. Returns {size: image}
+    """
+    if isinstance(img, CropTransform):
+        order = sorted(set(sizes), reverse=True)
+        return dict(zip(order, map_sizes(img.render, order, workers)))
+
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    img.load()
+
+    levels = {}
+    level = img
+    for size in sorted(set(sizes), reverse=True):
+        fx = level.width // (size * 2)
+        fy = level.height // (size * 2)
+        if fx > 1 or fy > 1:
+            level = level.reduce((max(1, fx), max(1, fy)))
+        levels[size] = level
+
+    order = list(levels)
+    resized = map_sizes(
+        lambda size: levels[size].resize((size, size), Image.LANCZOS),
+        order, workers)
+    return dict(zip(order, resized))
+
+def render_pngs(img, sizes=PNG_SIZES, workers=None, preset=None):
+    """
+    PNG bytes for every size of an image (no cache), optimised with preset
+    Returns ({size: png bytes}, bytes the optimiser saved)
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    pyramid = build_resize_pyramid(img, sizes, workers)
+    encoded = map_sizes(lambda size: optimise_png(pyramid[size], preset), sizes, workers)
+    return ({size: data for size, (data, _) in zip(sizes, encoded)},
+            sum(gain for _, gain in encoded))
+
+def render_pngs_streaming(src, sizes=PNG_SIZES, preset=None):
+    """
+    Low-memory render: PNG bytes for every size with one image alive at a time
+    A path decodes straight to a proxy just above the largest size. The
+    source is used for the largest size only and released right after (a
+    CropTransform also drops its sharper decode); each smaller size is
+    resized from the previous one, encoded and released before the next.
+    Returns ({size: png bytes}, bytes the optimiser saved)
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    if isinstance(src, str):
+        img = load_working_image(src, sizes[0])[0]
+    else:
+        img = load_icon_source(src)
+
+    pngs, saved = {}, 0
+    prev = None
+    for size in sizes:
+        if prev is None:
+            if isinstance(img, CropTransform):
+                cur = img.render(size)
+                img.release()
+            else:
+                cur = build_resize_pyramid(img, [size], 1)[size]
+            img = None
+        else:
+            cur = prev.resize((size, size), Image.LANCZOS)
+        pngs[size], gain = optimise_png(cur, preset)
+        saved += gain
+        prev = cur
+    return pngs, saved
+
+def reset_peak_rss():
+    """Restart the kernel's peak-RSS counter for this process (Linux 4.0+)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+def source_size(src):
+    """
+    (width, height) of the pixels a render will read, without decoding
+    For a CropTransform that may read a sharper decode, the original's size
+    """
+    if isinstance(src, CropTransform):
+        return src.origin[1] if src.origin else src.src.size
+    if isinstance(src, str):
+        with Image.open(src) as img:
+            return img.size
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        with Image.open(io.BytesIO(src)) as img:
+            return img.size
+    return src.size
+
+def plan_render(src_size, sizes, budget_mb, workers=None):
+    """
+    (streaming, workers) keeping the estimated render peak within budget_mb
+    The parallel path holds the RGBA source, the whole pyramid and two
+    buffers of the largest size per worker; it is used with the most
+    workers that fit in the budget left over the current RSS. Otherwise
+    render_pngs_streaming, which holds about one proxy and two sizes
+    """
+    workers = RENDER_WORKERS if workers is None else workers
+    if not budget_mb:
+        return False, workers
+    mb = lambda pixels: pixels * 4 / (1024 * 1024)
+    free = budget_mb - rss_mb()
+    base = mb(src_size[0] * src_size[1]) + sum(mb(size * size) for size in sizes)
+    top = mb(max(sizes) ** 2)
+    for count in range(max(1, workers), 0, -1):
+        if base + 2 * count * top <= free:
+            return False, count
+    return True, 1
+
+def hires_cap(path, full_size, budget_mb=None):
+    """
+    Largest short side a sharper decode of path may ask for within budget_mb
+    (default MEMORY_BUDGET_MB), or None when unbounded
+    The decode gets half of the budget left over the current RSS. JPEG
+    draft() may overshoot a request by up to 2x per side; other formats
+    decode the whole frame before reduce(), so they get all or nothing
+    """
+    budget_mb = MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    if not budget_mb:
+        return None
+    allowed = max(0.0, budget_mb - rss_mb()) / 2 * 1024 * 1024 / 4   # RGBA pixels
+    short, long = min(full_size), max(full_size)
+    try:
+        with Image.open(path) as img:
+            fmt = img.format
+    except Exception:
+        return 0
+    if fmt != "JPEG":
+        return short if short * long <= allowed else 0
+    return min(short, int((allowed * short / long) ** 0.5 / 2))
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (VmHWM)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _ico_bmp(img):
+    """32-bit BMP (DIB) payload for one .ico entry: BGRA rows + AND mask"""
+    w, h = img.size
+    xor = img.tobytes("raw", "BGRA", 0, -1)
+
+    # AND mask: 1 bit per pixel (1 = transparent), rows padded to 32 bits
+    mask = img.getchannel("A").point(lambda a: 255 if a == 0 else 0, "1")
+    mask = mask.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
+    row, padded = (w + 7) // 8, ((w + 31) // 32) * 4
+    and_mask = b"".join(mask[y * row:(y + 1) * row].ljust(padded, b"\0")
+                        for y in range(h))
+
+    header = struct.pack("<IiiHHIIiiII", 40, w, h * 2, 1, 32, 0,
+                         len(xor) + len(and_mask), 0, 0, 0, 0)
+    return header + xor + and_mask
+
+def build_ico(pngs, sizes=ICO_SIZES):
+    """
+    Pack rendered sizes into a Windows .ico file, entirely in memory
+    pngs maps pixel size -> PNG bytes (already rendered, never resized
+    again). The 256px entry keeps its PNG bytes as-is; smaller entries are
+    decoded and stored as 32-bit BMP for older Explorer versions
+    """
+    payloads = []
+    for size in sizes:
+        if size >= 256:
+            payloads.append((size, pngs[size]))
+        else:
+            img = Image.open(io.BytesIO(pngs[size])).convert("RGBA")
+            payloads.append((size, _ico_bmp(img)))
+
+    out = [struct.pack("<HHH", 0, 1, len(payloads))]
+    offset = 6 + 16 * len(payloads)
+    for size, data in payloads:
+        dim = 0 if size >= 256 else size
+        out.append(struct.pack("<BBBBHHII", dim, dim, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    out.extend(data for _, data in payloads)
+    return b"".join(out)
+
+def build_icns(pngs):
+    """
+    Pack PNG-encoded sizes into a macOS .icns file, entirely in memory
+    pngs maps pixel size -> PNG bytes and must hold every ICNS_SIZES entry.
+    Sizes shared by two chunk types (e.g. 256 for ic08 and ic13) are
+    encoded once. A TOC chunk comes first, as iconutil writes it
+    """
+    entries = [(ostype, pngs[size]) for ostype, size in ICNS_TYPES]
+    toc = b"TOC " + struct.pack(">I", 8 + 8 * len(entries))
+    toc += b"".join(ostype + struct.pack(">I", 8 + len(data))
+                    for ostype, data in entries)
+    body = toc + b"".join(ostype + struct.pack(">I", 8 + len(data)) + data
+                          for ostype, data in entries)
+    return b"icns" + struct.pack(">I", 8 + len(body)) + body
+
+# ==============================================================================
+#  RENDER CACHE (ICON_STORE)
+# ==============================================================================
+
+def file_digest(path):
+    """SHA-256 of a file's bytes"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def image_digest(img):
+    """SHA-256 of a decoded image (mode, size and pixels)"""
+    h = hashlib.sha256()
+    h.update(f"{img.mode}:{img.width}x{img.height}:".encode())
+    # Hash in row bands so no full-size pixel copy is made
+    for y in range(0, img.height, 256):
+        h.update(img.crop((0, y, img.width, min(img.height, y + 256))).tobytes())
+    return h.hexdigest()
+
+def cache_key(src_digest, size, fmt="png", crop=None):
+    """Cache key for one rendered output: source + crop + size + format"""
+    raw = "|".join([src_digest, crop or "-", str(size), fmt])
+    return hashlib.sha256(raw.encode()).hexdigest()[:40]
+
+def cache_get(key, fmt="png"):
+    """Return the cached file for key (and mark it recently used), or None"""
+    path = os.path.join(ICON_STORE, f"{key}.{fmt}")
+    try:
+        os.utime(path, None)
+        return path
+    except OSError:
+        return None
+
+def cache_put(key, data, fmt="png"):
+    """Store rendered bytes under key, written atomically"""
+    path = os.path.join(ICON_STORE, f"{key}.{fmt}")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+    except OSError:
         try:
-            resized = img.resize((size, size), Image.LANCZOS)
-            out_path = os.path.join(output_dir, f"{base_name}_{size}.png")
-            resized.save(out_path, "PNG")
-            icons.append(out_path)
+            os.remove(tmp)
+        except OSError:
+            pass
+        return None
+
+def cache_evict(max_bytes=None):
+    """Drop least recently used entries until the store fits max_bytes"""
+    if max_bytes is None:
+        max_bytes = ICON_STORE_MAX_BYTES
+    entries = []
+    total = 0
+    try:
+        for entry in os.scandir(ICON_STORE):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    except OSError:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def render_pngs_cached(src, sizes=PNG_SIZES, crop=None, max_bytes=None,
+                       workers=None, preset=None, budget_mb=None):
+    """
+    PNG bytes for every size, through the ICON_STORE render cache
+    src is anything load_icon_source() accepts. Sizes already in the cache
+    are read back as-is; a path or buffer is only decoded if some size is
+    missing. Missing sizes are rendered once (deduplicated pyramid) and
+    optimised in parallel with the PNG preset. Under a memory budget
+    (budget_mb, default MEMORY_BUDGET_MB) plan_render() picks the worker
+    count, or streams one size at a time (render_pngs_streaming) if even
+    one worker would not fit. Returns
+    ({size: png bytes}, cache hits, bytes the optimiser saved on misses)
+    """
+    if isinstance(src, CropTransform):
+        digest, crop = src.digest(), src.key()
+    elif isinstance(src, str):
+        digest = file_digest(src)
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        digest = hashlib.sha256(src).hexdigest()
+    else:
+        digest = image_digest(src)
+
+    # The preset and colour management are part of the key: a file renders
+    # differently with and without the sRGB stage
+    preset = preset or PNG_PRESET
+    variant = f"png:{preset}:{'srgb' if COLOR_MANAGE else 'raw'}"
+    sizes = sorted(set(sizes), reverse=True)
+    keys = {size: cache_key(digest, size, variant, crop) for size in sizes}
+    pngs = {}
+    for size in sizes:
+        path = cache_get(keys[size])
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    pngs[size] = f.read()
+            except OSError:
+                pass
+    missing = [size for size in sizes if size not in pngs]
+    saved = 0
+
+    if missing:
+        if budget_mb is None:
+            budget_mb = MEMORY_BUDGET_MB
+        streaming, workers = plan_render(source_size(src) if budget_mb else None,
+                                         missing, budget_mb, workers)
+        if streaming:
+            fresh, saved = render_pngs_streaming(src, missing, preset)
+        else:
+            fresh, saved = render_pngs(load_icon_source(src), missing, workers, preset)
+        for size in missing:
+            pngs[size] = fresh[size]
+            cache_put(keys[size], fresh[size])
+        cache_evict(max_bytes)
+
+    return pngs, len(sizes) - len(missing), saved
+
+def write_png_set(pngs, output_dir, base_name, sizes=PNG_SIZES, workers=None):
+    """Write already-encoded PNG sizes as <base_name>_<size>.png files"""
+    def _write(size):
+        out_path = os.path.join(output_dir, f"{base_name}_{size}.png")
+        try:
+            with open(out_path, 'wb') as f:
+                f.write(pngs[size])
+            return out_path
         except Exception as e:
             print(f"Warning: Could not create {size}px PNG: {e}")
-    
-    return icons
+            return None
+
+    return [p for p in map_sizes(_write, sizes, workers) if p]
 
-def create_hidden_png_set(img, output_dir, base_name=".drive_icon"):
+def pil_to_png_set(img, output_dir, base_name="icon", workers=None, preset=None):
+    """Convert PIL image (or CropTransform) to multiple PNG sizes for Linux"""
+    pngs, _ = render_pngs(load_icon_source(img), PNG_SIZES, workers, preset)
+    return write_png_set(pngs, output_dir, base_name, PNG_SIZES, workers)
+
+def create_hidden_png_set(img, output_dir, base_name=".drive_icon", workers=None,
+                          preset=None):
     """Create PNG set with hidden filenames (start with dot)"""
-    img = img.convert("RGBA")
-    icons = []
-    
-    for size in PNG_SIZES:
-        try:
-            resized = img.resize((size, size), Image.LANCZOS)
-            out_path = os.path.join(output_dir, f"{base_name}_{size}.png")
-            resized.save(out_path, "PNG")
-            icons.append(out_path)
-        except Exception as e:
-            print(f"Warning: Could not create {size}px hidden PNG: {e}")
-    
-    return icons
+    return pil_to_png_set(img, output_dir, base_name, workers, preset)
+
+# Sizes each artefact of emit_icon_artefacts needs
+ARTEFACT_SIZES = {
+    "png": PNG_SIZES,
+    "ico": ICO_SIZES,
+    "icns": ICNS_SIZES,
+    "thumbnail": [THUMB_SIZE],
+}
+
+def artefact_sizes(artefacts):
+    """Union of the pixel sizes a list of artefacts needs"""
+    sizes = set()
+    for name in artefacts:
+        sizes.update(ARTEFACT_SIZES[name])
+    return sizes
+
+def pack_artefacts(pngs, artefacts):
+    """Named byte buffers for artefacts, from already rendered PNG sizes"""
+    out = {f"png_{size}": data for size, data in pngs.items()}
+    if "ico" in artefacts:
+        out["ico"] = build_ico(pngs)
+    if "icns" in artefacts:
+        out["icns"] = build_icns(pngs)
+    if "thumbnail" in artefacts:
+        out["thumbnail"] = pngs[THUMB_SIZE]
+    return out
+
+def emit_icon_artefacts(src, artefacts=("png", "ico", "icns"), max_bytes=None,
+                        workers=None, preset=None, budget_mb=None):
+    """
+    Render every requested artefact from one source in a single pass
+    The union of the sizes the artefacts need goes through the render cache
+    once. Returns (buffers, cache hits, bytes saved by the PNG optimiser);
+    buffers are named byte buffers: "ico", "icns", "thumbnail" and
+    "png_<size>" for every rendered size, so the writers can place them on
+    any target
+    """
+    pngs, hits, saved = render_pngs_cached(src, artefact_sizes(artefacts),
+                                           max_bytes=max_bytes, workers=workers,
+                                           preset=preset, budget_mb=budget_mb)
+    return pack_artefacts(pngs, artefacts), hits, saved
+
+# ==============================================================================
+#  BATCH CONVERSION (icon packs)
+# ==============================================================================
+
+BATCH_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tiff", ".tif")
+
+def iter_batch_sources(src):
+    """
+    (name, encoded bytes) for every image in a directory tree or a .zip /
+    .tar(.gz/.bz2/.xz) archive, read one file at a time
+    """
+    if os.path.isdir(src):
+        for root, dirs, files in os.walk(src):
+            dirs.sort()
+            for fn in sorted(files):
+                if fn.lower().endswith(BATCH_EXTS):
+                    path = os.path.join(root, fn)
+                    with open(path, 'rb') as f:
+                        yield os.path.relpath(path, src), f.read()
+    elif zipfile.is_zipfile(src):
+        with zipfile.ZipFile(src) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(BATCH_EXTS):
+                    yield info.filename, zf.read(info)
+    else:
+        with tarfile.open(src, "r:*") as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(BATCH_EXTS):
+                    yield member.name, tf.extractfile(member).read()
+
+def _square_icon(img):
+    """Pad an image to a centred transparent square"""
+    side = max(img.size)
+    if img.width == img.height:
+        return img
+    sq = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    sq.paste(img, ((side - img.width) // 2, (side - img.height) // 2))
+    return sq
+
+def _batch_worker(shm_name, size, out_base, artefacts, preset):
+    """
+    Process-pool worker: render one image whose RGBA pixels sit in shared
+    memory and write its artefacts as <out_base>.ico / .icns / _<size>.png
+    Returns (files written, bytes the PNG optimiser saved)
+    """
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    img = None
+    try:
+        img = Image.frombuffer("RGBA", size, shm.buf, "raw", "RGBA", 0, 1)
+        pngs, saved = render_pngs(img, artefact_sizes(artefacts), 1, preset)
+    finally:
+        img = None
+        shm.close()
+
+    buffers = pack_artefacts(pngs, artefacts)
+    files = {}
+    if "png" in artefacts:
+        files.update((f"{out_base}_{s}.png", buffers[f"png_{s}"]) for s in PNG_SIZES)
+    if "ico" in artefacts:
+        files[f"{out_base}.ico"] = buffers["ico"]
+    if "icns" in artefacts:
+        files[f"{out_base}.icns"] = buffers["icns"]
+    if "thumbnail" in artefacts:
+        files[f"{out_base}_thumb.png"] = buffers["thumbnail"]
+
+    os.makedirs(os.path.dirname(out_base), exist_ok=True)
+    for path, data in files.items():
+        with open(path, 'wb') as f:
+            f.write(data)
+    return len(files), saved
+
+def batch_convert(src, artefacts=("png", "ico", "icns"), workers=None,
+                  preset=None, progress_cb=None, out_dir=None):
+    """
+    Convert every image in a directory or archive into an icon pack
+    Output goes to ICON_STORE/packs/<source name>/ (outside the LRU render
+    cache, so a big batch never evicts it). Sources are decoded here, one at
+    a time, to a reduced square proxy; the pixels reach the worker processes
+    through shared memory (no pickling) where every size is rendered and
+    encoded. progress_cb(n, name, ok, msg) fires once per file.
+    Returns (converted count, [(name, error), ...])
+    """
+    from multiprocessing import shared_memory
+
+    workers = workers or RENDER_WORKERS
+    if out_dir is None:
+        pack = os.path.basename(os.path.normpath(src))
+        for ext in (".gz", ".bz2", ".xz", ".tar", ".tgz", ".zip"):
+            if pack.lower().endswith(ext):
+                pack = pack[:-len(ext)]
+        out_dir = os.path.join(ICON_STORE, "packs", pack)
+    os.makedirs(out_dir, exist_ok=True)
+
+    converted, failures = 0, []
+    pending = {}
+    stems = {}
+
+    def report(name, ok, msg):
+        if progress_cb:
+            progress_cb(converted + len(failures), name, ok, msg)
+
+    def collect(futures):
+        nonlocal converted
+        for fut in futures:
+            name, shm = pending.pop(fut)
+            try:
+                files, saved = fut.result()
+                converted += 1
+                report(name, True, f"{files} files ({saved / 1024:.1f} KB saved)")
+            except Exception as e:
+                failures.append((name, str(e)))
+                report(name, False, str(e))
+            finally:
+                shm.close()
+                shm.unlink()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, data in iter_batch_sources(src):
+            # Archive member names may hold "..": keep output inside out_dir.
+            # Two sources mapping to one stem (a.png / a.jpg) would overwrite
+            # each other, so the later one is reported as failed instead
+            parts = os.path.splitext(name)[0].replace("\\", "/").split("/")
+            stem = "/".join(p for p in parts if p not in ("", ".", "..")) or "icon"
+            if stem in stems:
+                msg = f"output {stem} already written for {stems[stem]}"
+                failures.append((name, msg))
+                report(name, False, msg)
+                continue
+            stems[stem] = name
+            
+            shm = None
+            try:
+                img = _square_icon(load_working_image(io.BytesIO(data))[0])
+                raw = img.tobytes()
+                shm = shared_memory.SharedMemory(create=True, size=len(raw))
+                shm.buf[:len(raw)] = raw
+                fut = pool.submit(_batch_worker, shm.name, img.size,
+                                  os.path.join(out_dir, stem), tuple(artefacts), preset)
+            except Exception as e:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+                failures.append((name, str(e)))
+                report(name, False, str(e))
+                continue
+            pending[fut] = (name, shm)
+            del img, raw
+
+            # Keep a bounded number of decoded images in flight
+            if len(pending) >= workers * 2:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        collect(list(pending))
+
+    return converted, failures
 
 # ==============================================================================
 #  FILE ATTRIBUTE HELPERS (Linux)
@@ -474,10 +2150,13 @@ def set_icon_mate(mount_point, icon_path):
 def apply_linux_icon(mount_point, icon_src, label, portable_only, status_cb, done_cb):
     """
     Apply icon to Linux mount point
+    icon_src is a CropTransform from the editor, a decoded PIL image,
+    encoded image bytes, or an image path (only paths touch the disk)
     If portable_only=True: only creates files (no system config)
     If portable_only=False: also tries desktop-specific methods
     """
     t0 = time.time()
+    reset_peak_rss()
     
     def step(msg):
         status_cb(f"[{time.time()-t0:.1f}s] {msg}")
@@ -488,25 +2167,25 @@ def apply_linux_icon(mount_point, icon_src, label, portable_only, status_cb, don
         os.makedirs(icons_dir, exist_ok=True)
         step(f"Created .icons/ folder")
         
-        # Load image with PIL
-        from PIL import Image as _Img
-        pil_img = _Img.open(icon_src).convert("RGBA")
-        step("Image loaded")
-        
-        # Create standard PNG set (visible, will be hidden later)
-        step("Creating PNG icons...")
-        png_files = pil_to_png_set(pil_img, icons_dir, "drive_icon")
-        step(f"Created {len(png_files)} PNG icons")
-        
+        # Render the PNG set, .ico and .icns in one pass
+        # Sizes rendered before come straight from the ICON_STORE cache
+        step("Rendering icon sizes..." if not MEMORY_BUDGET_MB else
+             f"Rendering icon sizes (memory budget {MEMORY_BUDGET_MB} MB)...")
+        buffers, hits, saved = emit_icon_artefacts(icon_src, ("png", "ico", "icns"))
+        pngs = {size: buffers[f"png_{size}"] for size in PNG_SIZES}
+        step(f"Rendered {len(buffers)} icon buffers ({hits} sizes from cache)")
+        step(f"PNG optimiser ({PNG_PRESET}): {saved / 1024:.1f} KB saved, "
+             f"{sum(len(b) for b in buffers.values()) / 1024:.1f} KB total")
+
         # Create hidden PNG set (already hidden - starts with dot)
         step("Creating hidden PNG icons for Linux...")
-        hidden_pngs = create_hidden_png_set(pil_img, icons_dir, ".drive_icon")
+        hidden_pngs = write_png_set(pngs, icons_dir, ".drive_icon")
         step(f"Created {len(hidden_pngs)} hidden PNG icons")
-        
+
         # Main icon path for .directory (use hidden PNG)
         main_icon = os.path.join(icons_dir, ".drive_icon_256.png")
         if not os.path.exists(main_icon):
-            main_icon = hidden_pngs[0] if hidden_pngs else png_files[0]
+            main_icon = hidden_pngs[0]
         
         # Create .directory file (Linux standard)
         directory_file = os.path.join(mount_point, ".directory")
@@ -531,11 +2210,17 @@ def apply_linux_icon(mount_point, icon_src, label, portable_only, status_cb, don
             if label:
                 f.write(f"label={label}\n")
         step("autorun.inf created (Windows compatibility)")
+
+        # Create the .ico autorun.inf points at
+        ico_path = os.path.join(icons_dir, "drive_icon.ico")
+        with open(ico_path, 'wb') as f:
+            f.write(buffers["ico"])
+        step(".icons/drive_icon.ico created (Windows icon)")
         
-        # Create empty .VolumeIcon.icns for macOS compatibility
+        # Create .VolumeIcon.icns for macOS compatibility
         vol_icon = os.path.join(mount_point, ".VolumeIcon.icns")
-        with open(vol_icon, 'w') as f:
-            f.write("")
+        with open(vol_icon, 'wb') as f:
+            f.write(buffers["icns"])
         step(".VolumeIcon.icns created (macOS compatibility)")
         
         # If not portable only, try desktop-specific methods
@@ -558,21 +2243,28 @@ def apply_linux_icon(mount_point, icon_src, label, portable_only, status_cb, don
             
             step(msg)
         
-        # Hide visible PNG files (rename to start with dot)
-        hidden_count = 0
-        for png in png_files:
-            if os.path.exists(png):
-                new_path = set_hidden_linux(png)
-                if new_path != png:
-                    hidden_count += 1
+        # Remove visible PNG files left by older versions (or the Windows
+        # edition); they hold old artwork, so they must not replace the new set
+        removed_count = 0
+        for png in glob.glob(os.path.join(icons_dir, "drive_icon_*.png")):
+            try:
+                os.remove(png)
+                removed_count += 1
+            except OSError:
+                pass
         
-        step(f"Hidden {hidden_count} PNG files (renamed with dot)")
+        step(f"Removed {removed_count} stale visible PNG files")
         
         # Hide .directory file? No - it needs to be readable
         # But we can set permissions
         os.chmod(directory_file, 0o644)
         
         total = time.time() - t0
+        peak = peak_rss_mb()
+        if MEMORY_BUDGET_MB and peak > MEMORY_BUDGET_MB:
+            step(f"⚠️ Peak RSS {peak:.0f} MB exceeded the {MEMORY_BUDGET_MB} MB budget")
+        else:
+            step(f"Peak RSS {peak:.0f} MB")
         step(f"Done! Finished in {total:.1f}s")
         
         # Success message
@@ -585,12 +2277,12 @@ def apply_linux_icon(mount_point, icon_src, label, portable_only, status_cb, don
                 f"Distribution: {DISTRO}\n"
                 f"Time: {total:.1f}s\n\n"
                 f"📁 Files created:\n"
-                f"  • .icons/ - {len(png_files) + len(hidden_pngs)} PNG icons\n"
+                f"  • .icons/ - {len(hidden_pngs)} PNG icons\n"
                 f"  • .directory - Linux file manager config\n"
-                f"  • autorun.inf - Windows compatibility\n"
+                f"  • autorun.inf + .icons/drive_icon.ico - Windows compatibility\n"
                 f"  • .VolumeIcon.icns - macOS compatibility\n\n"
                 f"🔒 Hidden files:\n"
-                f"  • All PNG files renamed with dot prefix\n"
+                f"  • PNG icons written with a dot prefix (stale visible ones removed)\n"
                 f"  • .icons/ folder visible (but contains hidden PNGs)\n\n"
                 f"Plug this drive into ANY Linux PC:\n"
                 f"  ✅ Icon will appear automatically!\n"
@@ -666,10 +2358,28 @@ def drive_diagnostics_linux(mount_point):
     lines.append(f"Desktop Environment: {DE.upper()}")
     lines.append(f"Distribution: {DISTRO}")
     
+    # One bounded listing up front; a mount that does not answer is not
+    # touched again
+    try:
+        names = set(probe(mount_point, lambda: [e.name for e in os.scandir(mount_point)]))
+    except TimeoutError:
+        lines.append(f"Mount: UNRESPONSIVE (no answer within {PROBE_TIMEOUT:g}s)")
+        return "\n".join(lines)
+    except OSError:
+        names = set()
+    
     # Get device info
     info = get_device_info(mount_point)
     lines.append(f"Device: {info['device']}")
     lines.append(f"Filesystem: {info['fstype']}")
+    dev = block_device(info['dev']) if info['dev'] else None
+    if dev:
+        model = " ".join(x for x in (dev['disk_vendor'], dev['disk_model']) if x) or "unknown"
+        lines.append(f"Disk: {dev['disk']} ({model}, {dev['size']/(1024**3):.1f}GB)")
+        if dev['disk_serial']:
+            lines.append(f"Serial: {dev['disk_serial']}")
+        bus = f"USB {dev['disk_bus_path']}" if dev['disk_usb'] else "internal"
+        lines.append(f"Removable: {'YES' if dev['disk_removable'] else 'NO'}  |  Bus: {bus}")
     
     # Check if writable
     writable = ensure_writable(mount_point)
@@ -677,7 +2387,7 @@ def drive_diagnostics_linux(mount_point):
     
     # Check for .directory
     dir_file = os.path.join(mount_point, ".directory")
-    if os.path.exists(dir_file):
+    if ".directory" in names:
         lines.append(f".directory: EXISTS")
         try:
             with open(dir_file, 'r') as f:
@@ -690,7 +2400,7 @@ def drive_diagnostics_linux(mount_point):
     
     # Check for .icons folder
     icons_dir = os.path.join(mount_point, ".icons")
-    if os.path.exists(icons_dir):
+    if ".icons" in names:
         icons = glob.glob(os.path.join(icons_dir, "*"))
         lines.append(f"\n.icons/ folder: {len(icons)} files")
         for i in sorted(icons)[:8]:
@@ -704,13 +2414,11 @@ def drive_diagnostics_linux(mount_point):
         lines.append(f".icons/ folder: missing")
     
     # Check for autorun.inf
-    auto_file = os.path.join(mount_point, "autorun.inf")
-    if os.path.exists(auto_file):
+    if "autorun.inf" in names:
         lines.append(f"\nautorun.inf: EXISTS")
     
     # Check for .VolumeIcon.icns
-    vol_icon = os.path.join(mount_point, ".VolumeIcon.icns")
-    if os.path.exists(vol_icon):
+    if ".VolumeIcon.icns" in names:
         lines.append(f".VolumeIcon.icns: EXISTS")
     
     return "\n".join(lines)
@@ -793,14 +2501,68 @@ class StepLog(tk.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.destroy)
         self.log("\n─── Click X to close ───")
 
+# ==============================================================================
+#  PREVIEW COMPOSITOR
+# ==============================================================================
+
+CHECKER_COLOURS = ((200, 200, 200, 255), (160, 160, 160, 255))
+_checker_cache = {}
+
+def checkerboard(size, cell=8, colours=CHECKER_COLOURS):
+    """
+    Transparency checkerboard, size x size, memoised by size/cell/colours
+    Built by tiling one 2x2-cell block: a row strip, then the strip down the
+    board. Callers must not draw on the returned image
+    """
+    key = (size, cell, colours)
+    board = _checker_cache.get(key)
+    if board is not None:
+        return board
+    
+    block = Image.new("RGBA", (cell * 2, cell * 2), colours[0])
+    block.paste(colours[1], (cell, 0, cell * 2, cell))
+    block.paste(colours[1], (0, cell, cell, cell * 2))
+    
+    strip = Image.new("RGBA", (size, cell * 2))
+    for x in range(0, size, cell * 2):
+        strip.paste(block, (x, 0))
+    board = Image.new("RGBA", (size, size))
+    for y in range(0, size, cell * 2):
+        board.paste(strip, (0, y))
+    
+    _checker_cache[key] = board
+    return board
+
+def composite_preview(img, size, resample=Image.LANCZOS, fit=False, cell=8):
+    """
+    img over a checkerboard as a size x size RGBA preview, in one call
+    img is resized to size x size, or with fit=True shrunk to fit inside
+    it (aspect kept) and centred
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    board = checkerboard(size, cell)
+    if fit:
+        if img.width > size or img.height > size:
+            img = img.copy()
+            img.thumbnail((size, size), resample)
+        out = board.copy()
+        out.alpha_composite(img, ((size - img.width) // 2, (size - img.height) // 2))
+        return out
+    if img.size != (size, size):
+        img = img.resize((size, size), resample)
+    return Image.alpha_composite(board, img)
+
 # ==============================================================================
 #  CROP EDITOR
 # ==============================================================================
 
 EDITOR_SIZE = 320
+EDITOR_SETTLE_MS = 150  # quiet time after the last drag/zoom before the LANCZOS frame
+EDITOR_SMALL_SIZES = [48, 32, 16]
 
 class CropEditor(tk.Toplevel):
-    def __init__(self, parent, pil_image, callback):
+    def __init__(self, parent, pil_image, callback, origin=None):
         super().__init__(parent)
         self.title("Edit Icon — Drag to pan  |  Scroll to zoom")
         self.configure(bg=BG, padx=20, pady=16)
@@ -808,10 +2570,13 @@ class CropEditor(tk.Toplevel):
         self.grab_set()
         self._src = pil_image.convert("RGBA")
         self._cb = callback
+        self._origin = origin
         self._zoom = 1.0
         self._off = [0, 0]
         self._drag = None
-        self._smi = []
+        self._frame_job = None
+        self._settle_job = None
+        self._frame_fast = False
         self._build()
         self._center()
         self._redraw()
@@ -832,8 +2597,13 @@ class CropEditor(tk.Toplevel):
         self.cv.pack()
         self.cv.bind("<ButtonPress-1>", self._ds)
         self.cv.bind("<B1-Motion>", self._dm)
+        self.cv.bind("<ButtonRelease-1>", self._de)
         self.cv.bind("<MouseWheel>", self._mw)
         
+        # PhotoImages are created once and refreshed with paste()
+        self._te = ImageTk.PhotoImage("RGBA", (EDITOR_SIZE, EDITOR_SIZE))
+        self.cv.create_image(0, 0, anchor="nw", image=self._te)
+        
         rf = tk.Frame(top, bg=BG)
         rf.pack(side="left", anchor="n")
         
@@ -843,6 +2613,8 @@ class CropEditor(tk.Toplevel):
         self.pv = tk.Canvas(rf, width=128, height=128, bg="#000",
                            highlightthickness=1, highlightbackground=OVERLAY)
         self.pv.pack(pady=(0, 8))
+        self._tp = ImageTk.PhotoImage("RGBA", (128, 128))
+        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
         
         tk.Label(rf, text="Small sizes:", bg=BG, fg=SUBTEXT,
                  font=("Sans", 8)).pack(anchor="w")
@@ -850,6 +2622,15 @@ class CropEditor(tk.Toplevel):
         self.sm = tk.Canvas(rf, width=128, height=52, bg="#2a2a3e",
                            highlightthickness=0)
         self.sm.pack()
+        self._smi = []
+        x = 4
+        for s in EDITOR_SMALL_SIZES:
+            ti = ImageTk.PhotoImage("RGBA", (s, s))
+            self._smi.append(ti)
+            self.sm.create_image(x, 26, anchor="w", image=ti)
+            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
+                                fill=SUBTEXT, font=("Sans", 7))
+            x += s + 28
         
         tk.Label(rf, text="Background:", bg=BG, fg=SUBTEXT,
                  font=("Sans", 8)).pack(anchor="w", pady=(10, 2))
@@ -905,7 +2686,7 @@ class CropEditor(tk.Toplevel):
         self._off[0] = cx - (EDITOR_SIZE / 2) / self._zoom
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zlb.config(text=f"{int(v)}%")
-        self._redraw()
+        self._redraw(fast=True)
 
     def _ds(self, e):
         self._drag = (e.x, e.y, self._off[0], self._off[1])
@@ -916,6 +2697,10 @@ class CropEditor(tk.Toplevel):
         sx, sy, ox, oy = self._drag
         self._off[0] = ox + (sx - e.x) / self._zoom
         self._off[1] = oy + (sy - e.y) / self._zoom
+        self._redraw(fast=True)
+
+    def _de(self, e):
+        self._drag = None
         self._redraw()
 
     def _mw(self, e):
@@ -928,81 +2713,181 @@ class CropEditor(tk.Toplevel):
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zsl.set(int(self._zoom * 100))
         self.zlb.config(text=f"{int(self._zoom * 100)}%")
+        self._redraw(fast=True)
+
+    def _transform(self, origin=None):
+        return CropTransform(self._src, self._off, self._zoom,
+                             self._bg.get(), EDITOR_SIZE, origin)
+
+    def _crop(self, size=256, resample=Image.LANCZOS):
+        return self._transform().render(size, resample)
+
+    def _redraw(self, fast=False):
+        """
+        Queue a preview frame
+        Events arriving before the next idle cycle collapse into one frame.
+        fast frames (drag / zoom) sample NEAREST; a LANCZOS frame follows
+        once the input has been quiet for EDITOR_SETTLE_MS
+        """
+        if self._frame_job is None:
+            self._frame_fast = fast
+            self._frame_job = self.after_idle(self._render_frame)
+        else:
+            self._frame_fast = self._frame_fast and fast
+        
+        if self._settle_job is not None:
+            self.after_cancel(self._settle_job)
+            self._settle_job = None
+        if fast:
+            self._settle_job = self.after(EDITOR_SETTLE_MS, self._settle)
+
+    def _settle(self):
+        self._settle_job = None
         self._redraw()
 
-    def _crop(self, size=256):
-        sw, sh = self._src.size
-        x0, y0 = self._off
-        x1 = x0 + EDITOR_SIZE / self._zoom
-        y1 = y0 + EDITOR_SIZE / self._zoom
-        bv = self._bg.get()
-        
-        ci = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE),
-                      (255, 255, 255, 255) if bv == "white" else
-                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
-        
-        sx0, sy0 = max(0, x0), max(0, y0)
-        sx1, sy1 = min(sw, x1), min(sh, y1)
-        
-        if sx1 > sx0 and sy1 > sy0:
-            rg = self._src.crop((sx0, sy0, sx1, sy1))
-            px = int((sx0 - x0) * self._zoom)
-            py = int((sy0 - y0) * self._zoom)
-            pw = max(1, int((sx1 - sx0) * self._zoom))
-            ph = max(1, int((sy1 - sy0) * self._zoom))
-            rs = rg.resize((pw, ph), Image.LANCZOS)
-            ci.paste(rs, (px, py), rs)
-        
-        if bv == "circle":
-            mk = Image.new("L", (EDITOR_SIZE, EDITOR_SIZE), 0)
-            ImageDraw.Draw(mk).ellipse(
-                (0, 0, EDITOR_SIZE - 1, EDITOR_SIZE - 1), fill=255)
-            ot = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE), (0, 0, 0, 0))
-            ot.paste(ci, mask=mk)
-            ci = ot
+    def _render_frame(self):
+        self._frame_job = None
+        if self._frame_fast:
+            img = self._crop(EDITOR_SIZE, Image.NEAREST)
+            rs = Image.BILINEAR
+        else:
+            img = self._crop(EDITOR_SIZE)
+            rs = Image.LANCZOS
         
-        return ci.resize((size, size), Image.LANCZOS)
-
-    @staticmethod
-    def _chk(size, b=8):
-        img = Image.new("RGBA", (size, size))
-        d = ImageDraw.Draw(img)
-        for y in range(0, size, b):
-            for x in range(0, size, b):
-                c = ((200, 200, 200, 255) if (x // b + y // b) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + b - 1, y + b - 1], fill=c)
-        return img
+        self._te.paste(composite_preview(img, EDITOR_SIZE))
+        self._tp.paste(composite_preview(img, 128, rs))
+        for s, ti in zip(EDITOR_SMALL_SIZES, self._smi):
+            ti.paste(composite_preview(img, s, rs))
 
-    def _redraw(self):
-        img = self._crop(EDITOR_SIZE)
-        self._te = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(EDITOR_SIZE), img))
-        self.cv.delete("all")
-        self.cv.create_image(0, 0, anchor="nw", image=self._te)
-        
-        pv = img.resize((128, 128), Image.LANCZOS)
-        self._tp = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(128), pv))
-        self.pv.delete("all")
-        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
-        
-        self.sm.delete("all")
-        self._smi = []
-        x = 4
-        for s in [48, 32, 16]:
-            ti = ImageTk.PhotoImage(Image.alpha_composite(
-                self._chk(s), img.resize((s, s), Image.LANCZOS)))
-            self._smi.append(ti)
-            self.sm.create_image(x, 26, anchor="w", image=ti)
-            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
-                                fill=SUBTEXT, font=("Sans", 7))
-            x += s + 28
+    def destroy(self):
+        for job in (self._frame_job, self._settle_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._frame_job = self._settle_job = None
+        super().destroy()
 
     def _confirm(self):
-        self._cb(self._crop(256))
+        # Previews stay on the proxy; the result may read full resolution
+        self._cb(self._transform(self._origin))
         self.destroy()
 
+# ==============================================================================
+#  FRAME PICKER (animated GIF / WebP, multi-page TIFF)
+# ==============================================================================
+
+FRAME_PAGE = 8  # thumbnails per page (4 x 2)
+
+class FramePicker(tk.Toplevel):
+    def __init__(self, parent, path, callback):
+        super().__init__(parent)
+        self.title("Choose a frame")
+        self.configure(bg=BG, padx=20, pady=16)
+        self.resizable(False, False)
+        self.grab_set()
+        self._path = path
+        self._cb = callback
+        self._count = None
+        self._page = 0
+        self._cancel = None
+        self._imgs = {}
+        self._build()
+        self._show_page(0)
+
+    def _build(self):
+        tk.Label(self, text=os.path.basename(self._path), bg=BG, fg=TEXT,
+                 font=("Sans", 10, "bold")).pack(anchor="w")
+        self.info = tk.Label(self, text="Counting frames...", bg=BG,
+                             fg=SUBTEXT, font=("Sans", 8))
+        self.info.pack(anchor="w", pady=(0, 8))
+        
+        grid = tk.Frame(self, bg=BG)
+        grid.pack()
+        self._cells = []
+        for n in range(FRAME_PAGE):
+            cv = tk.Canvas(grid, width=THUMB_SIZE, height=THUMB_SIZE,
+                           bg=SURFACE, highlightthickness=1,
+                           highlightbackground=OVERLAY, cursor="hand2")
+            cv.grid(row=n // 4, column=n % 4, padx=4, pady=4)
+            cv.bind("<Button-1>", lambda e, n=n: self._choose(n))
+            self._cells.append(cv)
+        
+        br = tk.Frame(self, bg=BG)
+        br.pack(fill="x", pady=(10, 0))
+        self.prev_btn = flat_btn(br, "◀ Prev", lambda: self._show_page(self._page - 1))
+        self.prev_btn.pack(side="left", padx=(0, 8))
+        self.next_btn = flat_btn(br, "Next ▶", lambda: self._show_page(self._page + 1))
+        self.next_btn.pack(side="left")
+        flat_btn(br, "Cancel", self.destroy).pack(side="right")
+
+    def _show_page(self, page):
+        """Render only this page's frames, on a worker thread"""
+        if page < 0 or (self._count is not None and page * FRAME_PAGE >= self._count):
+            return
+        if self._cancel is not None:
+            self._cancel.set()
+        cancel = self._cancel = threading.Event()
+        self._page = page
+        self._imgs = {}
+        for cv in self._cells:
+            cv.delete("all")
+        if self._count is not None:
+            self._update_info()
+        
+        def _ui(fn, *args):
+            self.after(0, lambda: None if cancel.is_set() else fn(*args))
+        
+        def _work():
+            try:
+                if self._count is None:
+                    # n_frames may walk the whole file: never on the Tk thread
+                    with Image.open(self._path) as img:
+                        _ui(self._set_count, getattr(img, "n_frames", 1))
+                first = page * FRAME_PAGE
+                frames = range(first, first + FRAME_PAGE)
+                if self._count is not None:
+                    frames = range(first, min(first + FRAME_PAGE, self._count))
+                for i, t in iter_frame_thumbs(self._path, frames, cancel=cancel):
+                    _ui(self._set_thumb, i, t)
+            except EOFError:
+                pass
+            except Exception as e:
+                _ui(lambda m=str(e): self.info.config(text=f"Cannot read frames: {m}"))
+        
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _set_count(self, count):
+        self._count = count
+        self._update_info()
+
+    def _update_info(self):
+        first = self._page * FRAME_PAGE
+        last = min(first + FRAME_PAGE, self._count or 0)
+        self.info.config(text=f"Frames {first + 1}–{last} of {self._count}  |  "
+                              f"click one to use it")
+
+    def _set_thumb(self, i, t):
+        n = i - self._page * FRAME_PAGE
+        if not 0 <= n < FRAME_PAGE:
+            return
+        self._imgs[i] = ImageTk.PhotoImage(composite_preview(t, THUMB_SIZE, fit=True))
+        cv = self._cells[n]
+        cv.delete("all")
+        cv.create_image(0, 0, anchor="nw", image=self._imgs[i])
+        cv.create_text(4, THUMB_SIZE - 4, anchor="sw", text=str(i + 1),
+                       fill=TEXT, font=("Sans", 7, "bold"))
+
+    def _choose(self, n):
+        i = self._page * FRAME_PAGE + n
+        if i not in self._imgs:
+            return
+        self.destroy()
+        self._cb(i)
+
+    def destroy(self):
+        if self._cancel is not None:
+            self._cancel.set()
+        super().destroy()
+
 # ==============================================================================
 #  MAIN APPLICATION
 # ==============================================================================
@@ -1015,17 +2900,38 @@ class App(tk.Tk):
         self.resizable(False, False)
         
         self._src = None
+        self._origin = None
+        self._load_cancel = None
         self._final = None
-        self._ico = None
-        self._tmp = tempfile.mkdtemp()
+        self._tk_thumb = None
         self._mounts = []
         
         self.drive_var = tk.StringVar()
         self.label_var = tk.StringVar()
         self.portable_var = tk.BooleanVar(value=False)
         
+        # Mount changes arrive from the watcher; Refresh re-probes sizes
+        # and states on demand
+        self._watcher = MountWatcher()
+        try:
+            mounts = self._watcher.start()
+            self._watcher.subscribe(
+                lambda a, r, c: self.after(0, lambda: self._mounts_changed(a, r, c)))
+        except OSError:
+            self._watcher = None
+            mounts = None
+        
+        # Drives are announced as soon as they are plugged in, before mounting
+        self._uevents = UeventListener()
+        try:
+            self._uevents.subscribe(
+                lambda act, ev, rec: self.after(0, lambda: self._hotplug(act, ev, rec)))
+            self._uevents.start()
+        except OSError:
+            self._uevents = None
+        
         self._build_ui()
-        self._refresh_mounts()
+        self._refresh_mounts(mounts)
         
         # Check if running as root
         if os.geteuid() != 0:
@@ -1179,18 +3085,14 @@ class App(tk.Tk):
                 font=("Sans", 10, "bold")).pack(anchor="w", pady=(14, 4))
         tk.Frame(self, bg=OVERLAY, height=1).pack(fill="x", pady=(0, 8))
 
-    def _refresh_mounts(self):
-        """Refresh list of mount points"""
-        self._mounts = get_mount_points()
-        removable = get_removable_mounts()
-        
-        # Mark removable drives
-        removable_set = {m['mount_point'] for m in removable}
-        for m in self._mounts:
-            if m['mount_point'] in removable_set:
-                m['type'] = 'removable'
-            else:
-                m.setdefault('type', 'fixed')
+    def _refresh_mounts(self, mounts=None):
+        """Refresh list of mount points (rescans unless mounts are given)"""
+        if mounts is None and self._watcher:
+            # Re-probed on the watcher thread; _mounts_changed redraws
+            self._watcher.refresh()
+            return
+        current = self._get_drive() if self._mounts else None
+        self._mounts = get_mount_points() if mounts is None else mounts
         
         choices = []
         for m in self._mounts:
@@ -1204,14 +3106,38 @@ class App(tk.Tk):
             size_str = f"{total_gb:.1f}GB" if total_gb >= 1 else f"{m['total']/(1024**2):.0f}MB"
             
             type_icon = "💾" if dtype == 'removable' else "💽"
+            if m.get('state') == 'unresponsive':
+                type_icon, size_str = "⏳", "unresponsive"
             display = f"{type_icon} {mount}  {label}  ({fstype}, {size_str})"
             choices.append(display)
         
         self.combo["values"] = choices
         if choices:
-            self.combo.current(0)
+            # Keep the selected drive selected across refreshes
+            points = [m['mount_point'] for m in self._mounts]
+            keep = current and current['mount_point'] in points
+            self.combo.current(points.index(current['mount_point']) if keep else 0)
         self._on_drive()
 
+    def _hotplug(self, action, event, record):
+        """A block device appeared or went away (netlink uevent)"""
+        if event.get("DEVTYPE") != "disk":
+            return
+        if action == "add" and record and (record['disk_removable'] or record['disk_usb']):
+            model = " ".join(x for x in (record['vendor'], record['model']) if x)
+            self.status_v.set(f"Drive plugged in: {record['name']}"
+                              + (f" ({model})" if model else "") + ", waiting for it to mount...")
+        elif action == "remove":
+            self.status_v.set(f"Drive unplugged: {event.get('DEVNAME', event['DEVPATH'])}")
+
+    def _mounts_changed(self, added, removed, changed):
+        """Mount watcher reported a change"""
+        self._refresh_mounts(self._watcher.records())
+        if added:
+            self.status_v.set("Drive mounted: " + ", ".join(m['mount_point'] for m in added))
+        elif removed:
+            self.status_v.set("Drive removed: " + ", ".join(m['mount_point'] for m in removed))
+
     def _get_drive(self):
         """Get selected mount point info"""
         idx = self.combo.current()
@@ -1230,17 +3156,35 @@ class App(tk.Tk):
         mount = drive['mount_point']
         dtype = drive.get('type', 'fixed')
         
-        # Check for existing icon
+        # Check for existing icon off the Tk thread; a hung mount only
+        # costs a probe deadline on a worker
         dir_file = os.path.join(mount, ".directory")
-        if os.path.exists(dir_file):
-            self.cur_icon_l.config(text=f"Custom icon found: {dir_file}")
-        else:
-            self.cur_icon_l.config(text="No custom icon set for this mount point.")
+        self.cur_icon_l.config(text="Checking for a custom icon...")
+        
+        def work():
+            try:
+                found = probe(mount, os.path.exists, dir_file)
+            except TimeoutError:
+                found = None
+            self.after(0, lambda: self._icon_checked(mount, dir_file, found))
+        threading.Thread(target=work, daemon=True).start()
         
         # Show info
         info_text = f"  Device: {drive['device']}  |  Type: {dtype}  |  FS: {drive['fstype']}"
         self.info_l.config(text=info_text, fg=SUBTEXT)
 
+    def _icon_checked(self, mount, dir_file, found):
+        """Custom-icon probe finished (found is None if the mount hung)"""
+        drive = self._get_drive()
+        if not drive or drive['mount_point'] != mount:
+            return
+        if found is None:
+            self.cur_icon_l.config(text="Mount point is not responding.")
+        elif found:
+            self.cur_icon_l.config(text=f"Custom icon found: {dir_file}")
+        else:
+            self.cur_icon_l.config(text="No custom icon set for this mount point.")
+
     def _browse(self):
         """Browse for image file"""
         path = filedialog.askopenfilename(
@@ -1250,68 +3194,103 @@ class App(tk.Tk):
                       ("All files", "*.*")])
         if not path:
             return
-        try:
-            img = Image.open(path)
-            self._src = img.convert("RGBA")
-            self.img_var.set(path)
-            ext = os.path.splitext(path)[1].upper()
-            self.info_v.set(
-                f"File : {os.path.basename(path)}\n"
-                f"Size : {img.width} x {img.height} px  |  {ext}")
-            self._ico = None
-            self._final = None
-            self.conv_l.config(text="Click 'Edit / Crop icon' to adjust.",
-                               fg=YELLOW)
-            self._thumb_update(self._src)
-            self._open_editor()
-        except Exception as e:
-            messagebox.showerror("Error", f"Cannot open image:\n{e}")
+        self._load(path)
+
+    def _load(self, path, frame=None):
+        """Load path (frame of a multi-frame file) on a worker thread"""
+        # A new pick cancels the load still running for the previous one
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        cancel = self._load_cancel = threading.Event()
+        self._src = None
+        self._origin = None
+        self._final = None
+        self.img_var.set(path)
+        self.info_v.set(f"File : {os.path.basename(path)}\nSize : reading...")
+        self.conv_l.config(text="Loading image...", fg=YELLOW)
+
+        def _ui(fn, *args):
+            # Run on the Tk thread, unless this load was superseded
+            self.after(0, lambda: None if cancel.is_set() else fn(*args))
+
+        def _work():
+            try:
+                # Decode a reduced proxy; the editor reads full resolution
+                # from path only if the final crop needs it
+                result = load_image_progressive(
+                    path, cancel,
+                    on_header=lambda size, fmt: _ui(self._load_header, path, size, fmt),
+                    on_preview=lambda t: _ui(self._thumb_update, t),
+                    frame=frame,
+                    on_frames=lambda: _ui(self._pick_frame, path))
+                if result:
+                    _ui(self._load_done, path, frame or 0, *result)
+            except Exception as e:
+                _ui(self._load_failed, e)
+
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _load_header(self, path, size, fmt):
+        """Show dimensions and format as soon as the header is read"""
+        ext = fmt or os.path.splitext(path)[1].upper()
+        self.info_v.set(
+            f"File : {os.path.basename(path)}\n"
+            f"Size : {size[0]} x {size[1]} px  |  {ext}")
+
+    def _pick_frame(self, path):
+        """Animated / multi-page file: let the user choose the frame first"""
+        self._load_cancel = None
+        self.conv_l.config(text="Choose a frame...", fg=YELLOW)
+        FramePicker(self, path, lambda i: self._load(path, i))
+
+    def _load_done(self, path, frame, proxy, full_size):
+        """Pixels are ready: keep the proxy and open the editor"""
+        self._src = proxy
+        self._origin = (path, full_size, frame)
+        self.conv_l.config(text="Click 'Edit / Crop icon' to adjust.",
+                           fg=YELLOW)
+        self._open_editor()
+
+    def _load_failed(self, e):
+        """Report a load that raised on the worker"""
+        self._load_cancel = None
+        self.conv_l.config(text="Cannot open image.", fg=RED)
+        messagebox.showerror("Error", f"Cannot open image:\n{e}")
 
     def _thumb_update(self, pil_img):
-        """Update thumbnail preview"""
-        t = pil_img.copy().convert("RGBA")
-        t.thumbnail((96, 96), Image.LANCZOS)
-        
-        chk = Image.new("RGBA", (96, 96))
-        d = ImageDraw.Draw(chk)
-        for y in range(0, 96, 8):
-            for x in range(0, 96, 8):
-                c = ((200, 200, 200, 255) if (x // 8 + y // 8) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + 7, y + 7], fill=c)
-        
-        ox = (96 - t.width) // 2
-        oy = (96 - t.height) // 2
-        chk.paste(t, (ox, oy), t)
-        
-        self._tk_thumb = ImageTk.PhotoImage(chk)
-        self.thumb_cv.delete("all")
-        self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        """Update thumbnail preview (one PhotoImage, refreshed with paste())"""
+        chk = composite_preview(pil_img, THUMB_SIZE, fit=True)
+        if self._tk_thumb is None:
+            self._tk_thumb = ImageTk.PhotoImage(chk)
+            self.thumb_cv.delete("all")
+            self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        else:
+            self._tk_thumb.paste(chk)
 
     def _open_editor(self):
         """Open crop editor"""
         if self._src is None:
-            messagebox.showwarning("No image", "Please select an image first.")
+            if self._load_cancel is not None:
+                messagebox.showinfo("Loading", "The image is still loading.")
+            else:
+                messagebox.showwarning("No image", "Please select an image first.")
             return
-        CropEditor(self, self._src, self._edit_done)
+        CropEditor(self, self._src, self._edit_done, self._origin)
 
     def _edit_done(self, result):
-        """Handle edited image"""
+        """Handle edited icon (a CropTransform over the original image)"""
         self._final = result
-        self._thumb_update(result)
         try:
-            # Save as PNG for Linux
-            out = os.path.join(self._tmp, "drive_icon.png")
-            result.save(out, "PNG")
-            self._ico = out
+            self._thumb_update(result.render(THUMB_SIZE, hires=False))
             self.conv_l.config(text="Icon ready! Click Apply.", fg=GREEN)
             self.status_v.set("Icon ready.")
         except Exception as e:
+            self._final = None
             self.conv_l.config(text=f"Prepare failed: {e}", fg=RED)
 
     def _check_ready(self):
         """Check if ready to apply"""
-        if self._final is None or self._ico is None:
+        if self._final is None:
             messagebox.showwarning("Not Ready",
                 "Please select and edit an image first.")
             return False
@@ -1362,7 +3341,7 @@ class App(tk.Tk):
             return
 
         self._run_pipeline(apply_linux_icon,
-                          (mount, self._ico, self.label_var.get(),
+                          (mount, self._final, self.label_var.get(),
                            self.portable_var.get()))
 
     def _finish(self, success, msg, log):
@@ -1370,6 +3349,9 @@ class App(tk.Tk):
         self.progress.stop()
         self.progress.pack_forget()
         log.done()
+        # The sharper decode is only needed while rendering
+        if isinstance(self._final, CropTransform):
+            self._final.release()
         if success:
             messagebox.showinfo("Success!", msg)
             self._refresh_mounts()
@@ -1432,10 +3414,10 @@ class App(tk.Tk):
 
     def destroy(self):
         """Cleanup"""
-        try:
-            shutil.rmtree(self._tmp, ignore_errors=True)
-        except:
-            pass
+        if self._watcher:
+            self._watcher.stop()
+        if self._uevents:
+            self._uevents.stop()
         super().destroy()
 
 
@@ -1445,5 +3427,21 @@ if __name__ == "__main__":
         print("Python 3.6 or higher required")
         sys.exit(1)
     
+    # Batch mode: DriveIconSetterLinux.py --batch <folder|archive> [preset]
+    if len(sys.argv) >= 3 and sys.argv[1] == "--batch":
+        converted, failures = batch_convert(
+            sys.argv[2], preset=sys.argv[3] if len(sys.argv) > 3 else None,
+            progress_cb=lambda n, name, ok, msg:
+                print(f"[{n}] {'✅' if ok else '❌'} {name}: {msg}"))
+        print(f"Converted {converted} image(s), {len(failures)} failed")
+        sys.exit(1 if failures else 0)
+    
+    # Mount refresh benchmark: DriveIconSetterLinux.py --bench-mounts
+    if len(sys.argv) >= 2 and sys.argv[1] == "--bench-mounts":
+        print(f"{'mounts':>8} {'shown':>6} {'refresh ms':>11}")
+        for count, shown, ms in benchmark_mount_refresh():
+            print(f"{count:>8} {shown:>6} {ms:>11.2f}")
+        sys.exit(0)
+    
     app = App()
     app.mainloop()
\ No newline at end of file
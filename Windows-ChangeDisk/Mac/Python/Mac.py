@@ -24,11 +24,14 @@ import subprocess
 import tempfile
 import time
 import glob
+import io
+import struct
 import platform
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import plistlib
+from concurrent.futures import ThreadPoolExecutor
 
 # ── Auto-install Pillow ───────────────────────────────────────────────────────
 def _install_pillow():
@@ -190,49 +193,187 @@ def get_volume_uuid(volume_path):
 #  ICON CONVERSION FUNCTIONS
 # ==============================================================================
 
-def pil_to_icns(img, output_path):
-    """Convert PIL image to macOS .icns format"""
-    # Create iconset folder
-    iconset_dir = tempfile.mkdtemp()
-    
-    # Required sizes for macOS icons
-    sizes = [16, 32, 64, 128, 256, 512, 1024]
-    
-    for size in sizes:
-        # Standard resolution
-        img_resized = img.resize((size, size), Image.LANCZOS)
-        img_resized.save(os.path.join(iconset_dir, f"icon_{size}x{size}.png"))
-        
-        # High resolution (@2x)
-        if size * 2 <= 1024:
-            img_resized = img.resize((size * 2, size * 2), Image.LANCZOS)
-            img_resized.save(os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png"))
-    
-    # Convert iconset to icns using iconutil (macOS built-in)
-    icns_path = output_path
-    try:
-        subprocess.run(['iconutil', '-c', 'icns', iconset_dir, '-o', icns_path],
-                      capture_output=True, check=True)
-        return True
-    except:
-        # Fallback: just copy the largest PNG
-        shutil.copy2(os.path.join(iconset_dir, "icon_1024x1024.png"), icns_path + '.png')
-        return False
-    finally:
-        shutil.rmtree(iconset_dir, ignore_errors=True)
+class CropTransform:
+    """
+    Crop / zoom / background chosen in the CropEditor
+    Keeps the original source and the view parameters instead of a raster,
+    so every output size is resampled exactly once from the source.
+    off is the source pixel at the view's top-left corner, zoom is view
+    pixels per source pixel and view is the editor canvas size
+    """
+
+    def __init__(self, src, off, zoom, background, view):
+        self.src = src if src.mode == "RGBA" else src.convert("RGBA")
+        self.off = (float(off[0]), float(off[1]))
+        self.zoom = float(zoom)
+        self.background = background
+        self.view = view
+
+    def render(self, size, resample=Image.LANCZOS):
+        """Render the crop as a size x size RGBA image in one resample"""
+        sw, sh = self.src.size
+        x0, y0 = self.off
+        x1 = x0 + self.view / self.zoom
+        y1 = y0 + self.view / self.zoom
+        scale = self.zoom * size / self.view
+        bv = self.background
+
+        ci = Image.new("RGBA", (size, size),
+                      (255, 255, 255, 255) if bv == "white" else
+                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
+
+        sx0, sy0 = max(0, x0), max(0, y0)
+        sx1, sy1 = min(sw, x1), min(sh, y1)
+
+        if sx1 > sx0 and sy1 > sy0:
+            px = int(round((sx0 - x0) * scale))
+            py = int(round((sy0 - y0) * scale))
+            pw = max(1, int(round((sx1 - sx0) * scale)))
+            ph = max(1, int(round((sy1 - sy0) * scale)))
+            rs = self.src.resize((pw, ph), resample, box=(sx0, sy0, sx1, sy1))
+            ci.paste(rs, (px, py), rs)
+
+        if bv == "circle":
+            mk = Image.new("L", (size, size), 0)
+            ImageDraw.Draw(mk).ellipse((0, 0, size - 1, size - 1), fill=255)
+            ot = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            ot.paste(ci, mask=mk)
+            ci = ot
+
+        return ci
+
+def load_icon_source(src):
+    """
+    Decoded RGBA image for an icon source
+    Accepts a file path (CLI callers), encoded image bytes / memoryview, or
+    an already decoded PIL image, which is used as-is with no file round-trip.
+    A CropTransform is returned unchanged
+    """
+    if isinstance(src, CropTransform):
+        return src
+    if isinstance(src, str):
+        img = Image.open(src)
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        img = Image.open(io.BytesIO(src))
+    else:
+        img = src
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+def render_square(src, size):
+    """size x size render of a PIL image or a CropTransform"""
+    if isinstance(src, CropTransform):
+        return src.render(size)
+    return src.resize((size, size), Image.LANCZOS)
+
+# Threads used to resize/encode icon sizes in parallel (1 = serial)
+RENDER_WORKERS = os.cpu_count() or 1
+
+# Peak-RSS budget for low-RAM machines, in MB (0 = unbounded). With a budget,
+# sizes render one at a time, largest first, and each raster is released as
+# soon as it is encoded. Override with DRIVE_ICON_MEMORY_MB
+MEMORY_BUDGET_MB = int(os.environ.get("DRIVE_ICON_MEMORY_MB", "0"))
+
+# macOS .icns chunk types (PNG payloads) and the pixel size each one holds
+ICNS_TYPES = [(b"ic11", 32), (b"ic12", 64), (b"ic07", 128), (b"ic13", 256),
+              (b"ic08", 256), (b"ic14", 512), (b"ic09", 512), (b"ic10", 1024)]
+ICNS_SIZES = sorted({size for _, size in ICNS_TYPES}, reverse=True)
+
+def map_sizes(fn, items, workers=None):
+    """Run fn(item) for every item on a thread pool, results in input order"""
+    items = list(items)
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+def encode_png(img):
+    """Encode an image to PNG bytes"""
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+def render_png_sizes(img, sizes, workers=None):
+    """
+    PNG bytes for every unique size, rendered once each in parallel
+    (serially under MEMORY_BUDGET_MB, so one raster is alive at a time)
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    if workers is None and MEMORY_BUDGET_MB:
+        workers = 1
+    if not isinstance(img, CropTransform):
+        img.load()
+    data = map_sizes(lambda size: encode_png(render_square(img, size)), sizes, workers)
+    return dict(zip(sizes, data))
+
+def build_icns(pngs):
+    """
+    Pack PNG-encoded sizes into a macOS .icns file, entirely in memory
+    pngs maps pixel size -> PNG bytes and must hold every ICNS_SIZES entry.
+    Sizes shared by two chunk types (e.g. 256 for ic08 and ic13) are
+    encoded once. A TOC chunk comes first, as iconutil writes it
+    """
+    entries = [(ostype, pngs[size]) for ostype, size in ICNS_TYPES]
+    toc = b"TOC " + struct.pack(">I", 8 + 8 * len(entries))
+    toc += b"".join(ostype + struct.pack(">I", 8 + len(data))
+                    for ostype, data in entries)
+    body = toc + b"".join(ostype + struct.pack(">I", 8 + len(data)) + data
+                          for ostype, data in entries)
+    return b"icns" + struct.pack(">I", 8 + len(body)) + body
+
+def pil_to_icns(img, output_path, workers=None):
+    """
+    Convert PIL image (or CropTransform) to macOS .icns format
+    Written natively: no iconset folder, no iconutil
+    """
+    with open(output_path, 'wb') as f:
+        f.write(emit_icon_artefacts(img, ("icns",), workers)["icns"])
+    return True
+
+# Preview thumbnail size
+THUMB_SIZE = 96
+
+# Sizes each artefact of emit_icon_artefacts needs
+ARTEFACT_SIZES = {
+    "icns": ICNS_SIZES,
+    "png": [512],
+    "thumbnail": [THUMB_SIZE],
+}
+
+def emit_icon_artefacts(img, artefacts=("icns", "png"), workers=None):
+    """
+    Render every requested artefact from one image (or CropTransform) in a
+    single pass; the union of the sizes the artefacts need is rendered once.
+    Returns named byte buffers: "icns", "thumbnail" and "png_<size>" for
+    every rendered size, so the writers can place them on any target
+    """
+    sizes = set()
+    for name in artefacts:
+        sizes.update(ARTEFACT_SIZES[name])
+    pngs = render_png_sizes(img, sizes, workers)
+
+    out = {f"png_{size}": data for size, data in pngs.items()}
+    if "icns" in artefacts:
+        out["icns"] = build_icns(pngs)
+    if "thumbnail" in artefacts:
+        out["thumbnail"] = pngs[THUMB_SIZE]
+    return out
 
 def create_macos_icon_set(img, output_dir, base_name=".VolumeIcon"):
     """Create macOS icon set"""
     icons = []
+    buffers = emit_icon_artefacts(img, ("icns", "png"))
     
     # Create .VolumeIcon.icns (main macOS volume icon)
     icns_path = os.path.join(output_dir, f"{base_name}.icns")
-    if pil_to_icns(img, icns_path):
-        icons.append(icns_path)
+    with open(icns_path, 'wb') as f:
+        f.write(buffers["icns"])
+    icons.append(icns_path)
     
-    # Also create PNG versions for compatibility
+    # Also create PNG versions for compatibility (rendered in the same pass)
     png_path = os.path.join(output_dir, f"{base_name}.png")
-    img.resize((512, 512), Image.LANCZOS).save(png_path, "PNG")
+    with open(png_path, 'wb') as f:
+        f.write(buffers["png_512"])
     icons.append(png_path)
     
     return icons
@@ -336,7 +477,10 @@ def create_macos_metadata(volume_path, status_cb):
 # ==============================================================================
 
 def apply_macos_icon(volume, icon_src, label, status_cb, done_cb):
-    """Apply icon to macOS volume"""
+    """
+    Apply icon to macOS volume
+    icon_src: CropTransform, PIL image, image bytes or image path
+    """
     t0 = time.time()
     
     def step(msg):
@@ -358,9 +502,8 @@ def apply_macos_icon(volume, icon_src, label, status_cb, done_cb):
         except:
             step("⚠️ Volume is read-only - may fail")
         
-        # Load image with PIL
-        from PIL import Image as _Img
-        pil_img = _Img.open(icon_src).convert("RGBA")
+        # Load image (in-memory sources are used directly, paths are decoded)
+        pil_img = load_icon_source(icon_src)
         step("✅ Image loaded")
         
         # Create .icons folder for additional files
@@ -644,8 +787,59 @@ class StepLog(tk.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.destroy)
         self.log("\n─── Click X to close ───")
 
+# ── Preview Compositor ────────────────────────────────────────────────────────
+CHECKER_COLOURS = ((200, 200, 200, 255), (160, 160, 160, 255))
+_checker_cache = {}
+
+def checkerboard(size, cell=8, colours=CHECKER_COLOURS):
+    """
+    Transparency checkerboard, size x size, memoised by size/cell/colours
+    Built by tiling one 2x2-cell block: a row strip, then the strip down the
+    board. Callers must not draw on the returned image
+    """
+    key = (size, cell, colours)
+    board = _checker_cache.get(key)
+    if board is not None:
+        return board
+    
+    block = Image.new("RGBA", (cell * 2, cell * 2), colours[0])
+    block.paste(colours[1], (cell, 0, cell * 2, cell))
+    block.paste(colours[1], (0, cell, cell, cell * 2))
+    
+    strip = Image.new("RGBA", (size, cell * 2))
+    for x in range(0, size, cell * 2):
+        strip.paste(block, (x, 0))
+    board = Image.new("RGBA", (size, size))
+    for y in range(0, size, cell * 2):
+        board.paste(strip, (0, y))
+    
+    _checker_cache[key] = board
+    return board
+
+def composite_preview(img, size, resample=Image.LANCZOS, fit=False, cell=8):
+    """
+    img over a checkerboard as a size x size RGBA preview, in one call
+    img is resized to size x size, or with fit=True shrunk to fit inside
+    it (aspect kept) and centred
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    board = checkerboard(size, cell)
+    if fit:
+        if img.width > size or img.height > size:
+            img = img.copy()
+            img.thumbnail((size, size), resample)
+        out = board.copy()
+        out.alpha_composite(img, ((size - img.width) // 2, (size - img.height) // 2))
+        return out
+    if img.size != (size, size):
+        img = img.resize((size, size), resample)
+    return Image.alpha_composite(board, img)
+
 # ── Crop Editor (adapted from your existing code) ─────────────────────────────
 EDITOR_SIZE = 320
+EDITOR_SETTLE_MS = 150  # quiet time after the last drag/zoom before the LANCZOS frame
+EDITOR_SMALL_SIZES = [48, 32, 16]
 
 class CropEditor(tk.Toplevel):
     def __init__(self, parent, pil_image, callback):
@@ -659,7 +853,9 @@ class CropEditor(tk.Toplevel):
         self._zoom = 1.0
         self._off = [0, 0]
         self._drag = None
-        self._smi = []
+        self._frame_job = None
+        self._settle_job = None
+        self._frame_fast = False
         self._build()
         self._center()
         self._redraw()
@@ -680,8 +876,13 @@ class CropEditor(tk.Toplevel):
         self.cv.pack()
         self.cv.bind("<ButtonPress-1>", self._ds)
         self.cv.bind("<B1-Motion>", self._dm)
+        self.cv.bind("<ButtonRelease-1>", self._de)
         self.cv.bind("<MouseWheel>", self._mw)
         
+        # PhotoImages are created once and refreshed with paste()
+        self._te = ImageTk.PhotoImage("RGBA", (EDITOR_SIZE, EDITOR_SIZE))
+        self.cv.create_image(0, 0, anchor="nw", image=self._te)
+        
         rf = tk.Frame(top, bg=BG)
         rf.pack(side="left", anchor="n")
         
@@ -691,6 +892,8 @@ class CropEditor(tk.Toplevel):
         self.pv = tk.Canvas(rf, width=128, height=128, bg="#000",
                            highlightthickness=1, highlightbackground=OVERLAY)
         self.pv.pack(pady=(0, 8))
+        self._tp = ImageTk.PhotoImage("RGBA", (128, 128))
+        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
         
         tk.Label(rf, text="Sizes:", bg=BG, fg=SUBTEXT,
                  font=("SF Pro Text", 10)).pack(anchor="w")
@@ -698,6 +901,15 @@ class CropEditor(tk.Toplevel):
         self.sm = tk.Canvas(rf, width=128, height=52, bg=SURFACE,
                            highlightthickness=0)
         self.sm.pack()
+        self._smi = []
+        x = 4
+        for s in EDITOR_SMALL_SIZES:
+            ti = ImageTk.PhotoImage("RGBA", (s, s))
+            self._smi.append(ti)
+            self.sm.create_image(x, 26, anchor="w", image=ti)
+            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
+                                fill=SUBTEXT, font=("SF Pro Text", 8))
+            x += s + 28
         
         tk.Label(rf, text="Background:", bg=BG, fg=SUBTEXT,
                  font=("SF Pro Text", 10)).pack(anchor="w", pady=(10, 2))
@@ -753,7 +965,7 @@ class CropEditor(tk.Toplevel):
         self._off[0] = cx - (EDITOR_SIZE / 2) / self._zoom
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zlb.config(text=f"{int(v)}%")
-        self._redraw()
+        self._redraw(fast=True)
 
     def _ds(self, e):
         self._drag = (e.x, e.y, self._off[0], self._off[1])
@@ -764,6 +976,10 @@ class CropEditor(tk.Toplevel):
         sx, sy, ox, oy = self._drag
         self._off[0] = ox + (sx - e.x) / self._zoom
         self._off[1] = oy + (sy - e.y) / self._zoom
+        self._redraw(fast=True)
+
+    def _de(self, e):
+        self._drag = None
         self._redraw()
 
     def _mw(self, e):
@@ -776,79 +992,61 @@ class CropEditor(tk.Toplevel):
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zsl.set(int(self._zoom * 100))
         self.zlb.config(text=f"{int(self._zoom * 100)}%")
+        self._redraw(fast=True)
+
+    def _transform(self):
+        return CropTransform(self._src, self._off, self._zoom,
+                             self._bg.get(), EDITOR_SIZE)
+
+    def _crop(self, size=256, resample=Image.LANCZOS):
+        return self._transform().render(size, resample)
+
+    def _redraw(self, fast=False):
+        """
+        Queue a preview frame
+        Events arriving before the next idle cycle collapse into one frame.
+        fast frames (drag / zoom) sample NEAREST; a LANCZOS frame follows
+        once the input has been quiet for EDITOR_SETTLE_MS
+        """
+        if self._frame_job is None:
+            self._frame_fast = fast
+            self._frame_job = self.after_idle(self._render_frame)
+        else:
+            self._frame_fast = self._frame_fast and fast
+        
+        if self._settle_job is not None:
+            self.after_cancel(self._settle_job)
+            self._settle_job = None
+        if fast:
+            self._settle_job = self.after(EDITOR_SETTLE_MS, self._settle)
+
+    def _settle(self):
+        self._settle_job = None
         self._redraw()
 
-    def _crop(self, size=256):
-        sw, sh = self._src.size
-        x0, y0 = self._off
-        x1 = x0 + EDITOR_SIZE / self._zoom
-        y1 = y0 + EDITOR_SIZE / self._zoom
-        bv = self._bg.get()
-        
-        ci = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE),
-                      (255, 255, 255, 255) if bv == "white" else
-                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
-        
-        sx0, sy0 = max(0, x0), max(0, y0)
-        sx1, sy1 = min(sw, x1), min(sh, y1)
-        
-        if sx1 > sx0 and sy1 > sy0:
-            rg = self._src.crop((sx0, sy0, sx1, sy1))
-            px = int((sx0 - x0) * self._zoom)
-            py = int((sy0 - y0) * self._zoom)
-            pw = max(1, int((sx1 - sx0) * self._zoom))
-            ph = max(1, int((sy1 - sy0) * self._zoom))
-            rs = rg.resize((pw, ph), Image.LANCZOS)
-            ci.paste(rs, (px, py), rs)
-        
-        if bv == "circle":
-            mk = Image.new("L", (EDITOR_SIZE, EDITOR_SIZE), 0)
-            ImageDraw.Draw(mk).ellipse(
-                (0, 0, EDITOR_SIZE - 1, EDITOR_SIZE - 1), fill=255)
-            ot = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE), (0, 0, 0, 0))
-            ot.paste(ci, mask=mk)
-            ci = ot
-        
-        return ci.resize((size, size), Image.LANCZOS)
-
-    @staticmethod
-    def _chk(size, b=8):
-        img = Image.new("RGBA", (size, size))
-        d = ImageDraw.Draw(img)
-        for y in range(0, size, b):
-            for x in range(0, size, b):
-                c = ((200, 200, 200, 255) if (x // b + y // b) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + b - 1, y + b - 1], fill=c)
-        return img
-
-    def _redraw(self):
-        img = self._crop(EDITOR_SIZE)
-        self._te = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(EDITOR_SIZE), img))
-        self.cv.delete("all")
-        self.cv.create_image(0, 0, anchor="nw", image=self._te)
-        
-        pv = img.resize((128, 128), Image.LANCZOS)
-        self._tp = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(128), pv))
-        self.pv.delete("all")
-        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
+    def _render_frame(self):
+        self._frame_job = None
+        if self._frame_fast:
+            img = self._crop(EDITOR_SIZE, Image.NEAREST)
+            rs = Image.BILINEAR
+        else:
+            img = self._crop(EDITOR_SIZE)
+            rs = Image.LANCZOS
         
-        self.sm.delete("all")
-        self._smi = []
-        x = 4
-        for s in [48, 32, 16]:
-            ti = ImageTk.PhotoImage(Image.alpha_composite(
-                self._chk(s), img.resize((s, s), Image.LANCZOS)))
-            self._smi.append(ti)
-            self.sm.create_image(x, 26, anchor="w", image=ti)
-            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
-                                fill=SUBTEXT, font=("SF Pro Text", 8))
-            x += s + 28
+        self._te.paste(composite_preview(img, EDITOR_SIZE))
+        self._tp.paste(composite_preview(img, 128, rs))
+        for s, ti in zip(EDITOR_SMALL_SIZES, self._smi):
+            ti.paste(composite_preview(img, s, rs))
+
+    def destroy(self):
+        for job in (self._frame_job, self._settle_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._frame_job = self._settle_job = None
+        super().destroy()
 
     def _confirm(self):
-        self._cb(self._crop(256))
+        self._cb(self._transform())
         self.destroy()
 
 # ==============================================================================
@@ -864,7 +1062,7 @@ class App(tk.Tk):
         
         self._src = None
         self._final = None
-        self._ico = None
+        self._tk_thumb = None
         self._tmp = tempfile.mkdtemp()
         self._volumes = []
         
@@ -1075,7 +1273,6 @@ class App(tk.Tk):
             self.info_v.set(
                 f"File: {os.path.basename(path)}\n"
                 f"Size: {img.width} × {img.height} px  |  {ext}")
-            self._ico = None
             self._final = None
             self.conv_l.config(text="Click 'Edit / Crop' to adjust",
                                fg=YELLOW)
@@ -1085,25 +1282,14 @@ class App(tk.Tk):
             messagebox.showerror("Error", f"Cannot open image:\n{e}")
 
     def _thumb_update(self, pil_img):
-        """Update thumbnail preview"""
-        t = pil_img.copy().convert("RGBA")
-        t.thumbnail((96, 96), Image.LANCZOS)
-        
-        chk = Image.new("RGBA", (96, 96))
-        d = ImageDraw.Draw(chk)
-        for y in range(0, 96, 8):
-            for x in range(0, 96, 8):
-                c = ((200, 200, 200, 255) if (x // 8 + y // 8) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + 7, y + 7], fill=c)
-        
-        ox = (96 - t.width) // 2
-        oy = (96 - t.height) // 2
-        chk.paste(t, (ox, oy), t)
-        
-        self._tk_thumb = ImageTk.PhotoImage(chk)
-        self.thumb_cv.delete("all")
-        self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        """Update thumbnail preview (one PhotoImage, refreshed with paste())"""
+        chk = composite_preview(pil_img, THUMB_SIZE, fit=True)
+        if self._tk_thumb is None:
+            self._tk_thumb = ImageTk.PhotoImage(chk)
+            self.thumb_cv.delete("all")
+            self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        else:
+            self._tk_thumb.paste(chk)
 
     def _open_editor(self):
         """Open crop editor"""
@@ -1113,22 +1299,19 @@ class App(tk.Tk):
         CropEditor(self, self._src, self._edit_done)
 
     def _edit_done(self, result):
-        """Handle edited image"""
+        """Handle edited icon (a CropTransform over the original image)"""
         self._final = result
-        self._thumb_update(result)
         try:
-            # Save as PNG first
-            out = os.path.join(self._tmp, "drive_icon.png")
-            result.save(out, "PNG")
-            self._ico = out
+            self._thumb_update(result.render(THUMB_SIZE))
             self.conv_l.config(text="✓ Icon ready! Click Apply", fg=GREEN)
             self.status_v.set("Icon ready")
         except Exception as e:
+            self._final = None
             self.conv_l.config(text=f"Prepare failed: {e}", fg=RED)
 
     def _check_ready(self):
         """Check if ready to apply"""
-        if self._final is None or self._ico is None:
+        if self._final is None:
             messagebox.showwarning("Not Ready",
                 "Please select and edit an image first.")
             return False
@@ -1174,7 +1357,7 @@ class App(tk.Tk):
                 return
 
         self._run_pipeline(apply_macos_icon,
-                          (volume, self._ico, self.label_var.get()))
+                          (volume, self._final, self.label_var.get()))
 
     def _finish(self, success, msg, log):
         """Handle completion"""
@@ -23,12 +23,15 @@ import subprocess
 import tempfile
 import time
 import glob
+import io
+import struct
 import ctypes
 import winreg
 import platform
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ── Auto-install Pillow ───────────────────────────────────────────────────────
 def _install_pillow():
@@ -89,6 +92,13 @@ DRIVE_TYPE_LABEL = {
 }
 
 SIZES = [256, 128, 64, 48, 32, 16]
+RENDER_WORKERS = os.cpu_count() or 1  # threads for per-size resize/encode (1 = serial)
+THUMB_SIZE = 96  # preview thumbnail size
+
+# macOS .icns chunk types (PNG payloads) and the pixel size each one holds
+ICNS_TYPES = [(b"ic11", 32), (b"ic12", 64), (b"ic07", 128), (b"ic13", 256),
+              (b"ic08", 256), (b"ic14", 512), (b"ic09", 512), (b"ic10", 1024)]
+ICNS_SIZES = sorted({size for _, size in ICNS_TYPES}, reverse=True)
 REG_BASE = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\DriveIcons"
 ICO_STORE = os.path.expandvars(r"%ProgramData%\DriveIcons")
 
@@ -386,42 +396,232 @@ def safe_eject(drive):
 #  ICON CONVERSION FUNCTIONS
 # ==============================================================================
 
-def pil_to_ico(img, out_path):
-    """Convert PIL image to Windows .ico format"""
-    img = img.convert("RGBA")
-    icons = [img.resize((s, s), Image.LANCZOS) for s in SIZES]
-    icons[0].save(out_path, format="ICO",
-                  sizes=[(s, s) for s in SIZES], append_images=icons[1:])
+def map_sizes(fn, sizes, workers=None):
+    """Run fn(size) for every size on a thread pool, results in sizes order"""
+    sizes = list(sizes)
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers <= 1 or len(sizes) <= 1:
+        return [fn(size) for size in sizes]
+    with ThreadPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        return list(pool.map(fn, sizes))
+
+def load_icon_source(src):
+    """
+    Decoded RGBA image for an icon source
+    Accepts a file path (CLI callers), encoded image bytes / memoryview, or
+    an already decoded PIL image, which is used as-is with no file round-trip
+    """
+    if isinstance(src, CropTransform):
+        return src
+    if isinstance(src, str):
+        img = Image.open(src)
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        img = Image.open(io.BytesIO(src))
+    else:
+        img = src
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+class CropTransform:
+    """
+    Crop / zoom / background chosen in the CropEditor
+    Keeps the source image and the view parameters instead of a raster, so
+    every output size (up to the 1024px ICNS entries) is resampled once
+    from the source. off is the source pixel at the view's top-left corner,
+    zoom is view pixels per source pixel and view is the editor canvas size
+    """
+
+    def __init__(self, src, off, zoom, background, view):
+        self.src = src if src.mode == "RGBA" else src.convert("RGBA")
+        self.off = (float(off[0]), float(off[1]))
+        self.zoom = float(zoom)
+        self.background = background
+        self.view = view
+
+    def render(self, size, resample=Image.LANCZOS):
+        """Render the crop as a size x size RGBA image in one resample"""
+        sw, sh = self.src.size
+        x0, y0 = self.off
+        x1 = x0 + self.view / self.zoom
+        y1 = y0 + self.view / self.zoom
+        scale = self.zoom * size / self.view
+        bv = self.background
+
+        ci = Image.new("RGBA", (size, size),
+                      (255, 255, 255, 255) if bv == "white" else
+                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
+
+        sx0, sy0 = max(0, x0), max(0, y0)
+        sx1, sy1 = min(sw, x1), min(sh, y1)
+
+        if sx1 > sx0 and sy1 > sy0:
+            px = int(round((sx0 - x0) * scale))
+            py = int(round((sy0 - y0) * scale))
+            pw = max(1, int(round((sx1 - sx0) * scale)))
+            ph = max(1, int(round((sy1 - sy0) * scale)))
+            rs = self.src.resize((pw, ph), resample, box=(sx0, sy0, sx1, sy1))
+            ci.paste(rs, (px, py), rs)
+
+        if bv == "circle":
+            mk = Image.new("L", (size, size), 0)
+            ImageDraw.Draw(mk).ellipse((0, 0, size - 1, size - 1), fill=255)
+            ot = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            ot.paste(ci, mask=mk)
+            ci = ot
+
+        return ci
+
+def pil_to_ico(img, out_path, workers=None):
+    """Convert PIL image (or CropTransform) to Windows .ico format"""
+    data = emit_icon_artefacts(load_icon_source(img), ("ico",), workers)["ico"]
+    with open(out_path, 'wb') as f:
+        f.write(data)
 
 def pil_to_png(img, out_path, size=256):
-    """Convert PIL image to PNG for cross-platform compatibility"""
-    img = img.convert("RGBA")
-    resized = img.resize((size, size), Image.LANCZOS)
-    resized.save(out_path, "PNG")
+    """Convert PIL image (or CropTransform) to PNG for cross-platform compatibility"""
+    data = render_png_sizes(load_icon_source(img), [size])[size]
+    with open(out_path, 'wb') as f:
+        f.write(data)
+
+def encode_png(img):
+    """Encode an image to PNG bytes"""
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+def render_png_sizes(img, sizes, workers=None):
+    """
+    PNG bytes for every unique size, rendered once each in parallel
+    img is a decoded image or a CropTransform (each size rendered from its
+    source, never from a smaller raster)
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    if isinstance(img, CropTransform):
+        render = img.render
+    else:
+        img.load()
+        render = lambda size: img.resize((size, size), Image.LANCZOS)
+    data = map_sizes(lambda size: encode_png(render(size)), sizes, workers)
+    return dict(zip(sizes, data))
+
+def build_icns(pngs):
+    """
+    Pack PNG-encoded sizes into a macOS .icns file, entirely in memory
+    pngs maps pixel size -> PNG bytes and must hold every ICNS_SIZES entry.
+    Sizes shared by two chunk types (e.g. 256 for ic08 and ic13) are
+    encoded once. A TOC chunk comes first, as iconutil writes it
+    """
+    entries = [(ostype, pngs[size]) for ostype, size in ICNS_TYPES]
+    toc = b"TOC " + struct.pack(">I", 8 + 8 * len(entries))
+    toc += b"".join(ostype + struct.pack(">I", 8 + len(data))
+                    for ostype, data in entries)
+    body = toc + b"".join(ostype + struct.pack(">I", 8 + len(data)) + data
+                          for ostype, data in entries)
+    return b"icns" + struct.pack(">I", 8 + len(body)) + body
+
+def _ico_bmp(img):
+    """32-bit BMP (DIB) payload for one .ico entry: BGRA rows + AND mask"""
+    w, h = img.size
+    xor = img.tobytes("raw", "BGRA", 0, -1)
+
+    # AND mask: 1 bit per pixel (1 = transparent), rows padded to 32 bits
+    mask = img.getchannel("A").point(lambda a: 255 if a == 0 else 0, "1")
+    mask = mask.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
+    row, padded = (w + 7) // 8, ((w + 31) // 32) * 4
+    and_mask = b"".join(mask[y * row:(y + 1) * row].ljust(padded, b"\0")
+                        for y in range(h))
+
+    header = struct.pack("<IiiHHIIiiII", 40, w, h * 2, 1, 32, 0,
+                         len(xor) + len(and_mask), 0, 0, 0, 0)
+    return header + xor + and_mask
+
+def build_ico(pngs, sizes=SIZES):
+    """
+    Pack PNG-encoded sizes into a Windows .ico file, entirely in memory
+    The 256px entry keeps its PNG bytes as-is; smaller entries are stored
+    as 32-bit BMP so every Explorer version can read them
+    """
+    payloads = []
+    for size in sizes:
+        if size >= 256:
+            payloads.append((size, pngs[size]))
+        else:
+            img = Image.open(io.BytesIO(pngs[size])).convert("RGBA")
+            payloads.append((size, _ico_bmp(img)))
+
+    out = [struct.pack("<HHH", 0, 1, len(payloads))]
+    offset = 6 + 16 * len(payloads)
+    for size, data in payloads:
+        dim = 0 if size >= 256 else size
+        out.append(struct.pack("<BBBBHHII", dim, dim, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    out.extend(data for _, data in payloads)
+    return b"".join(out)
+
+# Sizes each artefact of emit_icon_artefacts needs
+ARTEFACT_SIZES = {
+    "ico": SIZES,
+    "png": SIZES,
+    "icns": ICNS_SIZES,
+    "thumbnail": [THUMB_SIZE],
+}
+
+def emit_icon_artefacts(img, artefacts=("ico", "png", "icns"), workers=None):
+    """
+    Render every requested artefact from one decoded image in a single pass
+    The union of the sizes the artefacts need is resized and encoded once.
+    Returns named byte buffers: "ico", "icns", "thumbnail" and "png_<size>"
+    for every rendered size, so the writers can place them on any target
+    """
+    sizes = set()
+    for name in artefacts:
+        sizes.update(ARTEFACT_SIZES[name])
+    pngs = render_png_sizes(img, sizes, workers)
+
+    out = {f"png_{size}": data for size, data in pngs.items()}
+    if "ico" in artefacts:
+        out["ico"] = build_ico(pngs)
+    if "icns" in artefacts:
+        out["icns"] = build_icns(pngs)
+    if "thumbnail" in artefacts:
+        out["thumbnail"] = pngs[THUMB_SIZE]
+    return out
 
 # ==============================================================================
 #  WINDOWS ICON CREATION FUNCTIONS
 # ==============================================================================
 
 def create_windows_icons(drive, ico_src, ico_dest, icons_dir, label, step_cb):
-    """Create Windows-specific icon files"""
+    """
+    Create Windows-specific icon files
+    ico_src is an existing .ico path or .ico bytes from emit_icon_artefacts,
+    written straight into ProgramData with no temporary file
+    """
     def log(msg):
         if step_cb:
             step_cb(msg)
     
     log("\n🪟 Creating Windows icons...")
     
-    # Copy to ProgramData (for Registry)
+    # Write / copy to ProgramData (for Registry)
     try:
-        shutil.copy2(ico_src, ico_dest)
-        log(f"  ✅ Copied to ProgramData")
+        if isinstance(ico_src, str):
+            shutil.copy2(ico_src, ico_dest)
+            log(f"  ✅ Copied to ProgramData")
+        else:
+            with open(ico_dest, 'wb') as f:
+                f.write(ico_src)
+            log(f"  ✅ Created icon in ProgramData")
     except Exception as e:
         log(f"  ⚠️ Could not copy to ProgramData: {e}")
     
     # Copy to .icons folder (for cross-platform)
     ico_root = os.path.join(icons_dir, "drive_icon.ico")
     try:
-        shutil.copy2(ico_src, ico_root)
+        if isinstance(ico_src, str):
+            shutil.copy2(ico_src, ico_root)
+        else:
+            with open(ico_root, 'wb') as f:
+                f.write(ico_src)
         log(f"  ✅ Copied to .icons folder")
     except Exception as e:
         log(f"  ⚠️ Could not copy to .icons: {e}")
@@ -481,23 +681,22 @@ def create_windows_icons(drive, ico_src, ico_dest, icons_dir, label, step_cb):
 #  LINUX/MACOS COMPATIBILITY FUNCTIONS
 # ==============================================================================
 
-def create_linux_icons(drive, pil_img, icons_dir, step_cb):
-    """Create Linux compatibility files"""
+def create_linux_icons(drive, buffers, icons_dir, step_cb):
+    """Create Linux compatibility files from emit_icon_artefacts buffers"""
     def log(msg):
         if step_cb:
             step_cb(msg)
     
     log("\n🐧 Creating Linux compatibility files...")
     
-    # Create PNGs for Linux
-    png_sizes = [256, 128, 64, 48, 32, 16]
+    # Write the PNGs for Linux (already rendered)
     png_files = []
     
-    for size in png_sizes:
+    for size in ARTEFACT_SIZES["png"]:
         png_path = os.path.join(icons_dir, f"drive_icon_{size}.png")
         try:
-            resized = pil_img.resize((size, size), Image.LANCZOS)
-            resized.save(png_path, "PNG")
+            with open(png_path, 'wb') as f:
+                f.write(buffers[f"png_{size}"])
             png_files.append(png_path)
             log(f"  ✅ Created {size}px PNG")
         except Exception as e:
@@ -506,7 +705,8 @@ def create_linux_icons(drive, pil_img, icons_dir, step_cb):
     # Create main PNG
     main_png = os.path.join(icons_dir, "drive_icon.png")
     try:
-        pil_img.resize((256, 256), Image.LANCZOS).save(main_png, "PNG")
+        with open(main_png, 'wb') as f:
+            f.write(buffers["png_256"])
         png_files.append(main_png)
         log(f"  ✅ Created main PNG")
     except Exception as e:
@@ -530,8 +730,8 @@ def create_linux_icons(drive, pil_img, icons_dir, step_cb):
     
     return png_files
 
-def create_macos_icons(drive, pil_img, icons_dir, step_cb):
-    """Create macOS compatibility files"""
+def create_macos_icons(drive, buffers, icons_dir, step_cb):
+    """Create macOS compatibility files from emit_icon_artefacts buffers"""
     def log(msg):
         if step_cb:
             step_cb(msg)
@@ -539,19 +739,22 @@ def create_macos_icons(drive, pil_img, icons_dir, step_cb):
     log("\n🍎 Creating macOS compatibility files...")
     mac_files = []
     
-    # Create 512px PNG for macOS
+    # Create the 512px PNG for macOS (rendered along with the .icns)
     png_large = os.path.join(icons_dir, "drive_icon_512.png")
+    icns_data = buffers["icns"]
     try:
-        pil_img.resize((512, 512), Image.LANCZOS).save(png_large, "PNG")
+        with open(png_large, 'wb') as f:
+            f.write(buffers["png_512"])
         log(f"  ✅ Created 512px PNG")
     except Exception as e:
         log(f"  ⚠️ Could not create 512px PNG: {e}")
         return []
     
-    # Create .VolumeIcon.icns (macOS volume icon)
+    # Create .VolumeIcon.icns (macOS volume icon, real ICNS container)
     mac_icon = os.path.join(drive, ".VolumeIcon.icns")
     try:
-        shutil.copy2(png_large, mac_icon)
+        with open(mac_icon, 'wb') as f:
+            f.write(icns_data)
         mac_files.append(mac_icon)
         log(f"  ✅ Created .VolumeIcon.icns")
     except Exception as e:
@@ -560,7 +763,8 @@ def create_macos_icons(drive, pil_img, icons_dir, step_cb):
     # Create VolumeIcon.icns (visible fallback)
     mac_icon_vis = os.path.join(drive, "VolumeIcon.icns")
     try:
-        shutil.copy2(png_large, mac_icon_vis)
+        with open(mac_icon_vis, 'wb') as f:
+            f.write(icns_data)
         mac_files.append(mac_icon_vis)
         log(f"  ✅ Created VolumeIcon.icns")
     except Exception as e:
@@ -712,7 +916,11 @@ def hide_all_windows_files(drive, icons_dir, png_files, mac_files, step_cb):
 ICO_FOLDER = ".icons"
 
 def apply_icon_pipeline(drive_info, ico_src, label, do_eject, status_cb, done_cb):
-    """Main pipeline to apply icon to drive"""
+    """
+    Main pipeline to apply icon to drive
+    ico_src: CropTransform (from the editor), decoded PIL image, image
+    bytes, or a path
+    """
     drive = drive_info['path']
     is_usb = (drive_info['type'] == DRIVE_REMOVABLE)
     is_sys = drive_info['is_system']
@@ -775,24 +983,29 @@ def apply_icon_pipeline(drive_info, ico_src, label, do_eject, status_cb, done_cb
             clear_attribs(icons_dir)
         os.makedirs(icons_dir, exist_ok=True)
 
-        # 6. Load PIL image
+        # 6. Load PIL image (in-memory sources are used directly) and
+        #    render every platform's files in one pass
         step(6, 15, "Loading image...")
-        from PIL import Image as _Img
-        pil_img = _Img.open(ico_src).convert("RGBA")
+        pil_img = load_icon_source(ico_src)
+        is_ico_file = isinstance(ico_src, str) and ico_src.lower().endswith(".ico")
+        artefacts = ("png", "icns") if is_ico_file else ("ico", "png", "icns")
+        buffers = emit_icon_artefacts(pil_img, artefacts)
+        step(6, 15, f"Rendered {len(buffers)} icon buffers.")
 
-        # 7. Create Windows icons
+        # 7. Create Windows icons (a path to an .ico is copied as-is)
         step(7, 15, "Creating Windows icons...")
-        create_windows_icons(drive, ico_src, ico_dest, icons_dir, label,
+        ico_file = ico_src if is_ico_file else buffers["ico"]
+        create_windows_icons(drive, ico_file, ico_dest, icons_dir, label,
                             lambda m: step(7, 15, m))
 
         # 8. Create Linux compatibility files
         step(8, 15, "Creating Linux compatibility files...")
-        png_files = create_linux_icons(drive, pil_img, icons_dir,
+        png_files = create_linux_icons(drive, buffers, icons_dir,
                                        lambda m: step(8, 15, m))
 
         # 9. Create macOS compatibility files
         step(9, 15, "Creating macOS compatibility files...")
-        mac_files = create_macos_icons(drive, pil_img, icons_dir,
+        mac_files = create_macos_icons(drive, buffers, icons_dir,
                                       lambda m: step(9, 15, m))
 
         # 10. Hide all files on Windows
@@ -1121,8 +1334,59 @@ class StepLog(tk.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.destroy)
         self.log("\n─── Click X to close ───")
 
+# ── Preview Compositor ────────────────────────────────────────────────────────
+CHECKER_COLOURS = ((200, 200, 200, 255), (160, 160, 160, 255))
+_checker_cache = {}
+
+def checkerboard(size, cell=8, colours=CHECKER_COLOURS):
+    """
+    Transparency checkerboard, size x size, memoised by size/cell/colours
+    Built by tiling one 2x2-cell block: a row strip, then the strip down the
+    board. Callers must not draw on the returned image
+    """
+    key = (size, cell, colours)
+    board = _checker_cache.get(key)
+    if board is not None:
+        return board
+    
+    block = Image.new("RGBA", (cell * 2, cell * 2), colours[0])
+    block.paste(colours[1], (cell, 0, cell * 2, cell))
+    block.paste(colours[1], (0, cell, cell, cell * 2))
+    
+    strip = Image.new("RGBA", (size, cell * 2))
+    for x in range(0, size, cell * 2):
+        strip.paste(block, (x, 0))
+    board = Image.new("RGBA", (size, size))
+    for y in range(0, size, cell * 2):
+        board.paste(strip, (0, y))
+    
+    _checker_cache[key] = board
+    return board
+
+def composite_preview(img, size, resample=Image.LANCZOS, fit=False, cell=8):
+    """
+    img over a checkerboard as a size x size RGBA preview, in one call
+    img is resized to size x size, or with fit=True shrunk to fit inside
+    it (aspect kept) and centred
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    board = checkerboard(size, cell)
+    if fit:
+        if img.width > size or img.height > size:
+            img = img.copy()
+            img.thumbnail((size, size), resample)
+        out = board.copy()
+        out.alpha_composite(img, ((size - img.width) // 2, (size - img.height) // 2))
+        return out
+    if img.size != (size, size):
+        img = img.resize((size, size), resample)
+    return Image.alpha_composite(board, img)
+
 # ── Crop Editor ───────────────────────────────────────────────────────────────
 EDITOR_SIZE = 320
+EDITOR_SETTLE_MS = 150  # quiet time after the last drag/zoom before the LANCZOS frame
+EDITOR_SMALL_SIZES = [48, 32, 16]
 
 class CropEditor(tk.Toplevel):
     def __init__(self, parent, pil_image, callback):
@@ -1136,7 +1400,9 @@ class CropEditor(tk.Toplevel):
         self._zoom = 1.0
         self._off = [0, 0]
         self._drag = None
-        self._smi = []
+        self._frame_job = None
+        self._settle_job = None
+        self._frame_fast = False
         self._build()
         self._center()
         self._redraw()
@@ -1157,8 +1423,13 @@ class CropEditor(tk.Toplevel):
         self.cv.pack()
         self.cv.bind("<ButtonPress-1>", self._ds)
         self.cv.bind("<B1-Motion>", self._dm)
+        self.cv.bind("<ButtonRelease-1>", self._de)
         self.cv.bind("<MouseWheel>", self._mw)
         
+        # PhotoImages are created once and refreshed with paste()
+        self._te = ImageTk.PhotoImage("RGBA", (EDITOR_SIZE, EDITOR_SIZE))
+        self.cv.create_image(0, 0, anchor="nw", image=self._te)
+        
         rf = tk.Frame(top, bg=BG)
         rf.pack(side="left", anchor="n")
         
@@ -1168,6 +1439,8 @@ class CropEditor(tk.Toplevel):
         self.pv = tk.Canvas(rf, width=128, height=128, bg="#000",
                            highlightthickness=1, highlightbackground=OVERLAY)
         self.pv.pack(pady=(0, 8))
+        self._tp = ImageTk.PhotoImage("RGBA", (128, 128))
+        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
         
         tk.Label(rf, text="Small sizes:", bg=BG, fg=SUBTEXT,
                  font=("Segoe UI", 8)).pack(anchor="w")
@@ -1175,6 +1448,15 @@ class CropEditor(tk.Toplevel):
         self.sm = tk.Canvas(rf, width=128, height=52, bg="#2a2a3e",
                            highlightthickness=0)
         self.sm.pack()
+        self._smi = []
+        x = 4
+        for s in EDITOR_SMALL_SIZES:
+            ti = ImageTk.PhotoImage("RGBA", (s, s))
+            self._smi.append(ti)
+            self.sm.create_image(x, 26, anchor="w", image=ti)
+            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
+                                fill=SUBTEXT, font=("Segoe UI", 7))
+            x += s + 28
         
         tk.Label(rf, text="Background:", bg=BG, fg=SUBTEXT,
                  font=("Segoe UI", 8)).pack(anchor="w", pady=(10, 2))
@@ -1230,7 +1512,7 @@ class CropEditor(tk.Toplevel):
         self._off[0] = cx - (EDITOR_SIZE / 2) / self._zoom
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zlb.config(text=f"{int(v)}%")
-        self._redraw()
+        self._redraw(fast=True)
 
     def _ds(self, e):
         self._drag = (e.x, e.y, self._off[0], self._off[1])
@@ -1241,6 +1523,10 @@ class CropEditor(tk.Toplevel):
         sx, sy, ox, oy = self._drag
         self._off[0] = ox + (sx - e.x) / self._zoom
         self._off[1] = oy + (sy - e.y) / self._zoom
+        self._redraw(fast=True)
+
+    def _de(self, e):
+        self._drag = None
         self._redraw()
 
     def _mw(self, e):
@@ -1253,79 +1539,60 @@ class CropEditor(tk.Toplevel):
         self._off[1] = cy - (EDITOR_SIZE / 2) / self._zoom
         self.zsl.set(int(self._zoom * 100))
         self.zlb.config(text=f"{int(self._zoom * 100)}%")
+        self._redraw(fast=True)
+
+    def _transform(self):
+        return CropTransform(self._src, self._off, self._zoom, self._bg.get(), EDITOR_SIZE)
+
+    def _crop(self, size=256, resample=Image.LANCZOS):
+        return self._transform().render(size, resample)
+
+    def _redraw(self, fast=False):
+        """
+        Queue a preview frame
+        Events arriving before the next idle cycle collapse into one frame.
+        fast frames (drag / zoom) sample NEAREST; a LANCZOS frame follows
+        once the input has been quiet for EDITOR_SETTLE_MS
+        """
+        if self._frame_job is None:
+            self._frame_fast = fast
+            self._frame_job = self.after_idle(self._render_frame)
+        else:
+            self._frame_fast = self._frame_fast and fast
+        
+        if self._settle_job is not None:
+            self.after_cancel(self._settle_job)
+            self._settle_job = None
+        if fast:
+            self._settle_job = self.after(EDITOR_SETTLE_MS, self._settle)
+
+    def _settle(self):
+        self._settle_job = None
         self._redraw()
 
-    def _crop(self, size=256):
-        sw, sh = self._src.size
-        x0, y0 = self._off
-        x1 = x0 + EDITOR_SIZE / self._zoom
-        y1 = y0 + EDITOR_SIZE / self._zoom
-        bv = self._bg.get()
-        
-        ci = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE),
-                      (255, 255, 255, 255) if bv == "white" else
-                      (0, 0, 0, 255) if bv == "black" else (0, 0, 0, 0))
-        
-        sx0, sy0 = max(0, x0), max(0, y0)
-        sx1, sy1 = min(sw, x1), min(sh, y1)
-        
-        if sx1 > sx0 and sy1 > sy0:
-            rg = self._src.crop((sx0, sy0, sx1, sy1))
-            px = int((sx0 - x0) * self._zoom)
-            py = int((sy0 - y0) * self._zoom)
-            pw = max(1, int((sx1 - sx0) * self._zoom))
-            ph = max(1, int((sy1 - sy0) * self._zoom))
-            rs = rg.resize((pw, ph), Image.LANCZOS)
-            ci.paste(rs, (px, py), rs)
-        
-        if bv == "circle":
-            mk = Image.new("L", (EDITOR_SIZE, EDITOR_SIZE), 0)
-            ImageDraw.Draw(mk).ellipse(
-                (0, 0, EDITOR_SIZE - 1, EDITOR_SIZE - 1), fill=255)
-            ot = Image.new("RGBA", (EDITOR_SIZE, EDITOR_SIZE), (0, 0, 0, 0))
-            ot.paste(ci, mask=mk)
-            ci = ot
-        
-        return ci.resize((size, size), Image.LANCZOS)
-
-    @staticmethod
-    def _chk(size, b=8):
-        img = Image.new("RGBA", (size, size))
-        d = ImageDraw.Draw(img)
-        for y in range(0, size, b):
-            for x in range(0, size, b):
-                c = ((200, 200, 200, 255) if (x // b + y // b) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + b - 1, y + b - 1], fill=c)
-        return img
-
-    def _redraw(self):
-        img = self._crop(EDITOR_SIZE)
-        self._te = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(EDITOR_SIZE), img))
-        self.cv.delete("all")
-        self.cv.create_image(0, 0, anchor="nw", image=self._te)
-        
-        pv = img.resize((128, 128), Image.LANCZOS)
-        self._tp = ImageTk.PhotoImage(
-            Image.alpha_composite(self._chk(128), pv))
-        self.pv.delete("all")
-        self.pv.create_image(0, 0, anchor="nw", image=self._tp)
+    def _render_frame(self):
+        self._frame_job = None
+        if self._frame_fast:
+            img = self._crop(EDITOR_SIZE, Image.NEAREST)
+            rs = Image.BILINEAR
+        else:
+            img = self._crop(EDITOR_SIZE)
+            rs = Image.LANCZOS
         
-        self.sm.delete("all")
-        self._smi = []
-        x = 4
-        for s in [48, 32, 16]:
-            ti = ImageTk.PhotoImage(Image.alpha_composite(
-                self._chk(s), img.resize((s, s), Image.LANCZOS)))
-            self._smi.append(ti)
-            self.sm.create_image(x, 26, anchor="w", image=ti)
-            self.sm.create_text(x + s + 2, 42, anchor="w", text=f"{s}px",
-                                fill=SUBTEXT, font=("Segoe UI", 7))
-            x += s + 28
+        self._te.paste(composite_preview(img, EDITOR_SIZE))
+        self._tp.paste(composite_preview(img, 128, rs))
+        for s, ti in zip(EDITOR_SMALL_SIZES, self._smi):
+            ti.paste(composite_preview(img, s, rs))
+
+    def destroy(self):
+        for job in (self._frame_job, self._settle_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._frame_job = self._settle_job = None
+        super().destroy()
 
     def _confirm(self):
-        self._cb(self._crop(256))
+        self._cb(self._transform())
         self.destroy()
 
 # ==============================================================================
@@ -1341,7 +1608,7 @@ class App(tk.Tk):
         
         self._src = None
         self._final = None
-        self._ico = None
+        self._tk_thumb = None
         self._tmp = tempfile.mkdtemp()
         self._drives = []
         
@@ -1595,7 +1862,6 @@ class App(tk.Tk):
                 f"File: {os.path.basename(path)}\n"
                 f"Size: {img.width} x {img.height} px  |  {ext}")
             
-            self._ico = None
             self._final = None
             self.conv_l.config(text="Click 'Edit / Crop icon' to adjust.",
                                fg=YELLOW)
@@ -1605,25 +1871,14 @@ class App(tk.Tk):
             messagebox.showerror("Error", f"Cannot open image:\n{e}")
 
     def _thumb_update(self, pil_img):
-        """Update thumbnail preview"""
-        t = pil_img.copy().convert("RGBA")
-        t.thumbnail((96, 96), Image.LANCZOS)
-        
-        chk = Image.new("RGBA", (96, 96))
-        d = ImageDraw.Draw(chk)
-        for y in range(0, 96, 8):
-            for x in range(0, 96, 8):
-                c = ((200, 200, 200, 255) if (x // 8 + y // 8) % 2 == 0
-                     else (160, 160, 160, 255))
-                d.rectangle([x, y, x + 7, y + 7], fill=c)
-        
-        ox = (96 - t.width) // 2
-        oy = (96 - t.height) // 2
-        chk.paste(t, (ox, oy), t)
-        
-        self._tk_thumb = ImageTk.PhotoImage(chk)
-        self.thumb_cv.delete("all")
-        self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        """Update thumbnail preview (one PhotoImage, refreshed with paste())"""
+        chk = composite_preview(pil_img, THUMB_SIZE, fit=True)
+        if self._tk_thumb is None:
+            self._tk_thumb = ImageTk.PhotoImage(chk)
+            self.thumb_cv.delete("all")
+            self.thumb_cv.create_image(0, 0, anchor="nw", image=self._tk_thumb)
+        else:
+            self._tk_thumb.paste(chk)
 
     def _open_editor(self):
         """Open crop editor"""
@@ -1633,22 +1888,15 @@ class App(tk.Tk):
         CropEditor(self, self._src, self._edit_done)
 
     def _edit_done(self, result):
-        """Handle edited image"""
+        """Handle edited icon (a CropTransform, rendered by the pipeline)"""
         self._final = result
-        self._thumb_update(result)
-        
-        try:
-            out = os.path.join(self._tmp, "drive_icon.ico")
-            pil_to_ico(result, out)
-            self._ico = out
-            self.conv_l.config(text="Icon ready! Click Apply.", fg=GREEN)
-            self.status_v.set("Icon ready")
-        except Exception as e:
-            self.conv_l.config(text=f"Convert failed: {e}", fg=RED)
+        self._thumb_update(result.render(THUMB_SIZE))
+        self.conv_l.config(text="Icon ready! Click Apply.", fg=GREEN)
+        self.status_v.set("Icon ready")
 
     def _check_ready(self):
         """Check if ready to apply"""
-        if not self._ico or not os.path.isfile(self._ico):
+        if self._final is None:
             messagebox.showwarning("Not Ready",
                 "Please select and edit an image first.")
             return False
@@ -1700,7 +1948,7 @@ class App(tk.Tk):
                 return
 
         self._run_pipeline(apply_icon_pipeline,
-                          (drive, self._ico, self.label_var.get(),
+                          (drive, self._final, self.label_var.get(),
                            self.eject_var.get()))
 
     def _finish(self, success, msg, log):